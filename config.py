@@ -125,20 +125,22 @@ SPEED_TEST_CONFIG = {
 #   - retry.connect/connect: 连接超时重试次数，通常与 total 相同
 #   - retry.read: 读取超时重试次数，通常与 total 相同
 #   - retry.backoff_factor: 退避因子，建议 0.3-1.0，值越大重试间隔越长
-#   - retry.status_forcelist: 需要重试的 HTTP 状态码列表
-#   - pool.connections: 连接池大小，建议 10-50，根据并发需求调整
-#   - pool.maxsize: 连接池最大大小，建议与 connections 相同
+#   - retry.backoff_max: 单次退避等待上限（秒），避免在失效源上等太久（有多个备用源可切换）
+#   - retry.status_forcelist: 需要重试的 HTTP 状态码列表（仅网关类瞬时错误，其余直接换源）
+#   - pool.connections: 连接池大小，None 表示按远程源数量（每个源一个连接池）
+#   - pool.maxsize: 连接池最大大小，None 表示按远程源数量（并发获取时不会出现 "pool is full"）
 HTTP_CLIENT_CONFIG = {
     "retry": {
-        "total": 3,
-        "connect": 3,
-        "read": 3,
-        "backoff_factor": 0.5,
-        "status_forcelist": [429, 500, 502, 503, 504],
+        "total": 2,
+        "connect": 2,
+        "read": 2,
+        "backoff_factor": 0.3,
+        "backoff_max": 3,
+        "status_forcelist": [502, 503, 504],
     },
     "pool": {
-        "connections": 20,
-        "maxsize": 20,
+        "connections": None,
+        "maxsize": None,
     },
 }
 
@@ -149,8 +151,10 @@ HTTP_CLIENT_CONFIG = {
 #     - 值过小：解析速度慢，用户体验差
 #     - 值过大：占用过多系统资源，可能导致 DNS 服务器限流
 #     - 推荐值：20（平衡速度与资源占用）
+#   - timeout: 单批解析的总超时（秒），超时未返回的域名直接放弃，建议 2-5
 DNS_RESOLVER_CONFIG = {
     "max_workers": 20,
+    "timeout": 3.0,
 }
 
 # UI 界面配置
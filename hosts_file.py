@@ -15,6 +15,9 @@ hosts 文件相关的“系统层”能力抽离：
 from __future__ import annotations
 
 import codecs
+import ctypes
+import functools
+import mmap
 import os
 import re
 import shutil
@@ -24,7 +27,7 @@ import tempfile
 import traceback
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple, Union
 
 from config import (
     BACKUP_DIR,
@@ -33,7 +36,7 @@ from config import (
     HOSTS_PATH,
     HOSTS_START_MARK,
 )
-from utils import restart_as_admin
+from utils import CREATE_NO_WINDOW, HIDDEN_STARTUPINFO, restart_as_admin
 
 
 @dataclass
@@ -43,6 +46,73 @@ class RemoveBlockResult:
     marker_damaged: bool
 
 
+@dataclass
+class HostsUpdate:
+    """写回 hosts 的完整字节内容（保持原文件编码/BOM）。"""
+
+    data: bytes
+    removed: bool
+    marker_damaged: bool
+    # 生成 data 时原文件的大小与“未变化前缀”长度；用于原地拼接写入（-1 表示未知）
+    base_size: int = -1
+    prefix_len: int = 0
+
+
+# UTF-16 BOM：非 ASCII 兼容，无法在原始字节上查找标记，需走文本路径
+_UTF16_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+# bytes.rstrip() 去掉的空白字节
+_ASCII_WS = frozenset(b" \t\n\r\x0b\x0c")
+
+
+def _load_dnsapi():
+    """加载 dnsapi.dll（仅 Windows）；失败返回 None，刷新 DNS 时回退到 ipconfig。"""
+    if sys.platform != "win32":
+        return None
+    try:
+        dll = ctypes.WinDLL("dnsapi.dll")
+        dll.DnsFlushResolverCache.restype = ctypes.c_int
+        dll.DnsFlushResolverCache.argtypes = []
+        return dll
+    except (OSError, AttributeError):
+        return None
+
+
+_dnsapi = _load_dnsapi()
+
+# 回退刷新命令：直接启动 ipconfig.exe，不经过 cmd.exe
+_FLUSHDNS_ARGV = ["ipconfig.exe", "/flushdns"]
+
+
+@dataclass(frozen=True)
+class _MarkBytes:
+    start: bytes
+    end: bytes
+    head: bytes  # 写入段开头："\n" + Start + "\n"
+    tail: bytes  # 写入段结尾：End + "\n"
+    # 单次正向扫描定位标记：先找第一个 Start/End，再从该处找 End 及其后空白
+    first_re: "re.Pattern[bytes]"
+    end_tail_re: "re.Pattern[bytes]"
+
+
+@functools.lru_cache(maxsize=None)
+def _mark_bytes(start_mark: str, end_mark: str) -> _MarkBytes:
+    """标记的字节形式与查找正则：每对标记只编码/编译一次（在 mmap 上直接查找，无需整文件解码）。"""
+    start_b = start_mark.encode("utf-8")
+    end_b = end_mark.encode("utf-8")
+    return _MarkBytes(
+        start=start_b,
+        end=end_b,
+        head=b"\n" + start_b + b"\n",
+        tail=end_b + b"\n",
+        first_re=re.compile(re.escape(start_b) + b"|" + re.escape(end_b)),
+        end_tail_re=re.compile(re.escape(end_b) + rb"\s*"),
+    )
+
+
+# 默认标记在模块加载时即编码
+_mark_bytes(HOSTS_START_MARK, HOSTS_END_MARK)
+
+
 class HostsFileManager:
     def __init__(
         self,
@@ -58,6 +128,9 @@ class HostsFileManager:
         self.backup_file_fmt = backup_file_fmt
         self.start_mark = start_mark
         self.end_mark = end_mark
+        self._marks = _mark_bytes(start_mark, end_mark)
+        # 上次写入的 hosts 内容：(mtime_ns, size, bytes)；文件被外部改动后失效
+        self._hosts_cache: Optional[Tuple[int, int, bytes]] = None
 
     # -----------------------------------------------------------------
     # Backup
@@ -148,7 +221,7 @@ class HostsFileManager:
 
     def write_hosts_atomic(
         self,
-        text: str,
+        text: Union[str, bytes],
         *,
         encoding: str = "utf-8",
         allow_elevate: bool = True,
@@ -160,14 +233,18 @@ class HostsFileManager:
         - 方案2：系统临时目录写入 + shutil.copy2 覆盖
         - 方案3：hosts 同目录 .smarttmp + os.replace 原子替换
         - 若判断为权限问题：可选自动提权重启（allow_elevate=True）
+
+        text 可为 str（按 encoding 编码一次）或已编码的 bytes（原样写入）。
         """
         tmp_path: Optional[str] = None
         hosts_tmp: Optional[str] = None
+        data = text.encode(encoding) if isinstance(text, str) else bytes(text)
 
         # 方案1：直接写入（最直接的方法，优先尝试）
         try:
-            with open(self.hosts_path, "w", encoding=encoding, newline="\n") as f:
-                f.write(text)
+            with open(self.hosts_path, "wb") as f:
+                f.write(data)
+            self._remember_hosts_bytes(data)
             return
         except Exception:
             pass
@@ -175,17 +252,16 @@ class HostsFileManager:
         # 方案2：使用系统临时目录 + shutil.copy2（避免部分路径限制）
         try:
             with tempfile.NamedTemporaryFile(
-                mode="w",
-                encoding=encoding,
-                newline="\n",
+                mode="wb",
                 suffix=".smarttmp",
                 delete=False,
             ) as f:
-                f.write(text)
+                f.write(data)
                 tmp_path = f.name
 
             shutil.copy2(tmp_path, self.hosts_path)
             os.remove(tmp_path)
+            self._remember_hosts_bytes(data)
             return
         except Exception:
             if tmp_path and os.path.exists(tmp_path):
@@ -197,10 +273,11 @@ class HostsFileManager:
         # 方案3：在 hosts 文件所在目录创建临时文件 + os.replace（更接近“原子”）
         try:
             hosts_tmp = self.hosts_path + ".smarttmp"
-            with open(hosts_tmp, "w", encoding=encoding, newline="\n") as f:
-                f.write(text)
+            with open(hosts_tmp, "wb") as f:
+                f.write(data)
 
             os.replace(hosts_tmp, self.hosts_path)
+            self._remember_hosts_bytes(data)
             return
         except Exception:
             if hosts_tmp and os.path.exists(hosts_tmp):
@@ -221,14 +298,13 @@ class HostsFileManager:
                     pass
 
             # 保存要写入的内容到临时文件，以便提权后直接写入（writer mode）
+            # 以字节保存，writer mode 原样写回，不再经过编码/换行转换
             with tempfile.NamedTemporaryFile(
-                mode="w",
-                encoding=encoding,
-                newline="\n",
+                mode="wb",
                 suffix=".hostscontent",
                 delete=False,
             ) as f:
-                f.write(text)
+                f.write(data)
                 temp_content_path = f.name
 
             args = sys.argv.copy()
@@ -238,6 +314,59 @@ class HostsFileManager:
 
         raise PermissionError("无法写入 hosts 文件：尝试了多种写入方案均失败。")
 
+    def write_hosts_update(
+        self,
+        upd: HostsUpdate,
+        *,
+        allow_elevate: bool = True,
+        on_need_elevation: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """写入 prepare_smart_block_update 的结果。
+
+        优先原地拼接：跳过未变化的前缀，只从 prefix_len 处写入剩余字节，再截断到
+        新长度；文件在读取后被改动、或原地写入失败时，回退到 write_hosts_atomic。
+        """
+        try:
+            if self._splice_in_place(upd):
+                self._remember_hosts_bytes(upd.data)
+                return
+        except OSError:
+            pass
+        self.write_hosts_atomic(upd.data, allow_elevate=allow_elevate, on_need_elevation=on_need_elevation)
+
+    def _splice_in_place(self, upd: HostsUpdate) -> bool:
+        if upd.base_size < 0:
+            return False
+        fd = os.open(self.hosts_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        try:
+            return self._splice_fd(fd, upd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _splice_fd(fd: int, upd: HostsUpdate) -> bool:
+        """在已打开的 fd 上原地拼接写入；文件大小与读取时不一致则放弃（返回 False）。"""
+        if upd.base_size < 0 or os.fstat(fd).st_size != upd.base_size:
+            return False
+        data = upd.data
+        pos = upd.prefix_len
+        if pos == len(data) == upd.base_size:
+            return True  # 内容未变化
+        view = memoryview(data)[pos:]
+        if hasattr(os, "pwrite"):
+            while view:
+                n = os.pwrite(fd, view, pos)
+                view = view[n:]
+                pos += n
+        else:
+            # Windows 无 os.pwrite：lseek + write
+            os.lseek(fd, pos, os.SEEK_SET)
+            while view:
+                n = os.write(fd, view)
+                view = view[n:]
+        os.ftruncate(fd, len(data))
+        return True
+
     # -----------------------------------------------------------------
     # SmartHostsTool block
     # -----------------------------------------------------------------
@@ -268,38 +397,261 @@ class HostsFileManager:
         """构建写入段（与原版一致）。"""
         return (
             f"\n{self.start_mark}\n"
-            + "\n".join([f"{ip} {dom}" for ip, dom in records])
+            + "\n".join(map(" ".join, records))
             + f"\n{self.end_mark}\n"
         )
 
+    def build_block_bytes(self, records: List[Tuple[str, str]]) -> Optional[bytes]:
+        """构建写入段的 ASCII 字节形式（内容与 build_block 相同）。
+
+        先按记录算出总长度，一次分配 bytearray 后按偏移切片写入，构建过程中不再扩容；
+        记录含非 ASCII 字符时返回 None，由调用方回退到文本路径。
+        """
+        head, tail = self._marks.head, self._marks.tail
+        body = 0
+        for ip, dom in records:
+            if not (ip.isascii() and dom.isascii()):
+                return None
+            body += len(ip) + len(dom) + 2  # ASCII：字符数即字节数；"ip dom\n"
+        if not records:
+            body = 1
+        buf = bytearray(len(head) + body + len(tail))
+
+        off = len(head)
+        buf[0:off] = head
+        for ip, dom in records:
+            n = len(ip)
+            buf[off:off + n] = ip.encode("ascii")
+            off += n
+            buf[off:off + 1] = b" "
+            off += 1
+            n = len(dom)
+            buf[off:off + n] = dom.encode("ascii")
+            off += n
+            buf[off:off + 1] = b"\n"
+            off += 1
+        if not records:
+            buf[off:off + 1] = b"\n"
+            off += 1
+        buf[off:off + len(tail)] = tail
+        return bytes(buf)
+
+    def prepare_smart_block_update(self, records: List[Tuple[str, str]]) -> HostsUpdate:
+        """读取 hosts 并生成“移除旧块 + 追加新块”后的完整字节内容。
+
+        通过 mmap 只读映射 hosts，在原始字节上查找 Start/End 标记，避免整文件
+        解码/再编码的往返；安全策略与 remove_existing_smart_block 一致。
+        UTF-16 文件或记录含非 ASCII 字符时回退到文本路径。
+        """
+        blk = self.build_block_bytes(records)
+        if blk is None:
+            return self._prepare_update_text(records)
+
+        with open(self.hosts_path, "rb") as f:
+            return self._prepare_from_fd(f.fileno(), records, blk)
+
+    def apply_smart_block(
+        self,
+        records: List[Tuple[str, str]],
+        *,
+        allow_elevate: bool = True,
+        on_need_elevation: Optional[Callable[[], None]] = None,
+    ) -> HostsUpdate:
+        """移除旧块并写入新块：读取与原地写入共用同一个 O_RDWR 句柄。
+
+        无法以读写方式打开（例如权限不足）或原地写入失败时，回退到
+        prepare_smart_block_update + write_hosts_atomic（可自动提权）。
+        """
+        blk = self.build_block_bytes(records)
+        upd: Optional[HostsUpdate] = None
+        if blk is not None:
+            try:
+                fd = os.open(self.hosts_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+            except OSError:
+                fd = -1
+            if fd != -1:
+                try:
+                    upd = self._prepare_from_fd(fd, records, blk)
+                    if self._splice_fd(fd, upd):
+                        self._remember_hosts_bytes(upd.data)
+                        return upd
+                    if upd.base_size >= 0:
+                        upd = None  # 读取后文件大小已变化：下面重新读取
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+
+        if upd is None:
+            upd = self.prepare_smart_block_update(records)
+        self.write_hosts_atomic(upd.data, allow_elevate=allow_elevate, on_need_elevation=on_need_elevation)
+        return upd
+
+    def _prepare_from_fd(self, fd: int, records: List[Tuple[str, str]], blk: bytes) -> HostsUpdate:
+        # 上次写入后文件未被改动：直接复用缓存内容，省去一次整文件读取
+        cached = self._cached_hosts_bytes()
+        if cached is not None:
+            # 缓存的也可能是文本路径写出的 UTF-16 内容：同样不能在字节上拼接 ASCII 块
+            if cached[:2] in _UTF16_BOMS:
+                return self._prepare_update_text(records)
+            return self._splice_smart_block(cached, blk)
+
+        if os.fstat(fd).st_size == 0:
+            return HostsUpdate(data=blk, removed=False, marker_damaged=False, base_size=0)
+        # mmap 在返回前关闭：Windows 上存在映射视图时无法截断文件
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:2] in _UTF16_BOMS:
+                return self._prepare_update_text(records)
+            return self._splice_smart_block(mm, blk)
+
+    def _splice_smart_block(self, buf, blk: bytes) -> HostsUpdate:
+        """在原始字节（mmap 或 bytes）上移除旧块并追加 blk。
+
+        只计算要保留的区间，最后用 memoryview 切片一次 join 出结果：
+        不产生 “前缀 + 后缀 + rstrip + 新块” 的中间副本。
+        """
+        removed = damaged = False
+        marks = self._marks
+        size = len(buf)
+        first = marks.first_re.search(buf)
+
+        if first is None:
+            keep = [(0, size)]
+        elif first.group() == marks.start:
+            m_end = marks.end_tail_re.search(buf, first.end())
+            if m_end is None:
+                # 标记损坏：只有 Start -> 不删除旧段，仅追加
+                damaged = True
+                keep = [(0, size)]
+            else:
+                # 与正则 Start.*?End\s* 等价：同时吞掉旧块后的空白
+                removed = True
+                keep = [(0, first.start()), (m_end.end(), size)]
+        else:
+            # End 在前：若后面没有 Start 则视为标记损坏；两者都在但顺序颠倒时保持原样
+            damaged = buf.find(marks.start, first.end()) == -1
+            keep = [(0, size)]
+
+        # 等价于对拼接结果 rstrip()：从最后一个区间往前去掉结尾空白
+        while keep:
+            lo, hi = keep[-1]
+            while hi > lo and buf[hi - 1] in _ASCII_WS:
+                hi -= 1
+            if hi > lo:
+                keep[-1] = (lo, hi)
+                break
+            keep.pop()
+
+        with memoryview(buf) as mv:
+            data = b"".join([mv[lo:hi] for lo, hi in keep] + [blk])
+
+        # 第一个保留区间从 0 开始且原样拷贝：这部分必然相同，不再逐块切片比较
+        known = keep[0][1] if keep else 0
+        return HostsUpdate(
+            data=data,
+            removed=removed,
+            marker_damaged=damaged,
+            base_size=size,
+            prefix_len=self._common_prefix_len(buf, data, start=known),
+        )
+
+    def _cached_hosts_bytes(self) -> Optional[bytes]:
+        """若 hosts 的 (mtime_ns, size) 与上次写入后一致，返回缓存的内容。"""
+        if self._hosts_cache is None:
+            return None
+        try:
+            st = os.stat(self.hosts_path)
+        except OSError:
+            return None
+        mtime_ns, size, data = self._hosts_cache
+        if st.st_mtime_ns == mtime_ns and st.st_size == size:
+            return data
+        self._hosts_cache = None
+        return None
+
+    def _remember_hosts_bytes(self, data: bytes) -> None:
+        """写入成功后记录内容与新的 mtime，供下次写入复用。"""
+        try:
+            st = os.stat(self.hosts_path)
+        except OSError:
+            self._hosts_cache = None
+            return
+        self._hosts_cache = (st.st_mtime_ns, st.st_size, data) if st.st_size == len(data) else None
+
+    @staticmethod
+    def _common_prefix_len(old, new: bytes, chunk: int = 4096, *, start: int = 0) -> int:
+        """old 与 new 相同前缀的长度（按块比较，比较本身在 C 层完成）。
+
+        start：调用方已知 old[:start] == new[:start]，从该处开始比较。
+        """
+        n = min(len(old), len(new))
+        i = min(start, n)
+        while i < n and old[i:i + chunk] == new[i:i + chunk]:
+            i += chunk
+        if i >= n:
+            return n
+        end = min(i + chunk, n)
+        while i < end and old[i] == new[i]:
+            i += 1
+        return i
+
+    def _prepare_update_text(self, records: List[Tuple[str, str]]) -> HostsUpdate:
+        """文本路径（UTF-16 / 非 ASCII 记录）：解码 -> 移除旧块 -> 按原编码写回。"""
+        content, enc = self.read_hosts_text()
+        rm = self.remove_existing_smart_block(content)
+        final_text = rm.content.rstrip() + self.build_block(records)
+        return HostsUpdate(
+            data=final_text.encode(enc),
+            removed=rm.removed,
+            marker_damaged=rm.marker_damaged,
+        )
+
     # -----------------------------------------------------------------
     # OS utilities
     # -----------------------------------------------------------------
     @staticmethod
-    def flush_dns_cache() -> None:
-        """刷新 DNS 缓存（Windows）。"""
+    def flush_dns_cache(*, wait: bool = True) -> None:
+        """刷新 DNS 缓存（Windows）。
+
+        优先进程内直接调用 DnsFlushResolverCache；不可用或返回失败时回退到 ipconfig /flushdns。
+        wait=False 时 ipconfig 以 Popen 启动后立即返回，不等待其退出（调用方不关心结果时使用）。
+        """
         if sys.platform != "win32":
             return
-        try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        except Exception:
-            startupinfo = None
-        subprocess.run("ipconfig /flushdns", shell=True, startupinfo=startupinfo)
+        if _dnsapi is not None:
+            try:
+                if _dnsapi.DnsFlushResolverCache():
+                    return
+            except OSError:
+                pass
+        if not wait:
+            subprocess.Popen(
+                _FLUSHDNS_ARGV,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                startupinfo=HIDDEN_STARTUPINFO,
+                creationflags=CREATE_NO_WINDOW,
+            )
+            return
+        subprocess.run(
+            _FLUSHDNS_ARGV,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
+        )
 
     def open_hosts_file(self) -> None:
-        """用系统默认方式打开 hosts 文件。"""
+        """用系统默认方式打开 hosts 文件（不阻塞调用线程）。"""
+        startfile = getattr(os, "startfile", None)
+        if startfile is None:
+            return
         try:
-            os.startfile(self.hosts_path)  # type: ignore[attr-defined]
+            startfile(self.hosts_path)
             return
-        except Exception:
+        except OSError:
             pass
 
-        # fallback：notepad（仅Windows）
-        if sys.platform == "win32":
-            try:
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            except Exception:
-                startupinfo = None
-            subprocess.run(["notepad", self.hosts_path], startupinfo=startupinfo)
+        # fallback：notepad（仅Windows）；Popen 不等待编辑器关闭
+        # 注意不传 HIDDEN_STARTUPINFO：其 wShowWindow=SW_HIDE 会把记事本窗口也隐藏
+        subprocess.Popen(["notepad.exe", self.hosts_path], close_fds=True)
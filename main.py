@@ -23,6 +23,8 @@ from config import APP_NAME, APP_THEME, LOG_CONFIG, TRAY_CONFIG
 from hosts_file import HostsFileManager
 from utils import check_and_elevate, get_logger, resource_path, setup_logger
 
+_ICON_PATH = resource_path("icon.ico")
+
 
 def _run_writer_mode(write_content_path: str, encoding: str) -> None:
     """提权后的写入模式：写入 hosts -> 刷新 DNS -> 退出。"""
@@ -35,7 +37,8 @@ def _run_writer_mode(write_content_path: str, encoding: str) -> None:
 
     success = False
     try:
-        with open(write_content_path, "r", encoding=encoding) as f:
+        # 临时文件保存的是已编码字节，原样写回（不做解码/换行转换）
+        with open(write_content_path, "rb") as f:
             content = f.read()
 
         # 这里关闭"再次提权"，避免循环
@@ -95,17 +98,17 @@ def main() -> None:
     logger.info("管理员权限检查通过")
 
     import ttkbootstrap as ttk  # 延迟导入，避免 writer mode 拉起 GUI 依赖
+    from tkinter import TclError
     from main_window import HostsOptimizer
 
     logger.info("初始化 GUI 界面...")
     app = ttk.Window(themename=APP_THEME)
-    ico = resource_path("icon.ico")
-    if os.path.exists(ico):
-        try:
-            app.iconbitmap(ico)
-            logger.debug(f"设置窗口图标: {ico}")
-        except Exception as e:
-            logger.warning(f"设置窗口图标失败: {e}")
+    # 不预先 stat：图标缺失时 iconbitmap 直接抛 TclError
+    try:
+        app.iconbitmap(_ICON_PATH)
+        logger.debug(f"设置窗口图标: {_ICON_PATH}")
+    except (TclError, OSError) as e:
+        logger.debug(f"设置窗口图标失败: {e}")
 
     # 创建主窗口
     hosts_optimizer = HostsOptimizer(app)
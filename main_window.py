@@ -12,14 +12,21 @@ GUI 层（ttkbootstrap）：
 
 from __future__ import annotations
 
+import asyncio
+import bisect
 import concurrent.futures
+import functools
 import os
+import queue
 import re
+import sched
 import socket
-import subprocess
 import sys
+import subprocess
 import threading
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Set, Tuple
 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
@@ -67,6 +74,49 @@ GRADIENT_SPLIT_POINT = 0.55
 # 噪声阈值配置（灰度值 0-255，推荐 100-150，控制噪声生成密度）
 NOISE_THRESHOLD_GRAY = 120
 
+# 测速结果排序刷新节流（毫秒）
+# RESULT_SORT_THROTTLE_MS: 常规刷新间隔（推荐 300-800ms）
+# RESULT_SORT_THROTTLE_SLOW_MS: 完成度低于 RESULT_SORT_SLOW_UNTIL_RATIO 时的刷新间隔（结果仍在大量涌入）
+RESULT_SORT_THROTTLE_MS = 500
+RESULT_SORT_THROTTLE_SLOW_MS = 1000
+RESULT_SORT_SLOW_UNTIL_RATIO = 0.8
+
+# 测速结果泵间隔（毫秒）：工作线程把结果放入队列，主线程按此间隔批量取出并更新 UI
+RESULT_PUMP_INTERVAL_MS = 50
+# 每次泵最多取出的 IP 结果数：突发大量结果时分摊到多个周期，单次回调不长时间占住主线程
+RESULT_PUMP_MAX_BATCH = 200
+# 高级测速在常驻事件循环中并发执行的 IP 数上限（协程无需每路一个线程，可远高于线程池规模）
+SPEED_TEST_ASYNC_CONCURRENCY = 128
+
+# 结果表鼠标滚轮每格滚动的行数（结果表为虚拟滚动，滚轮由程序处理）
+RESULT_WHEEL_ROWS = 3
+
+# Toast 默认显示时长（毫秒）
+TOAST_DEFAULT_DURATION_MS = UI_CONFIG.get("toast", {}).get("default_duration_ms", 1800)
+
+# 状态栏进度文本刷新间隔（毫秒）：测速进度在窗口内只应用最后一次，减少 configure 与样式重算
+STATUS_THROTTLE_MS = 100
+
+# DNS 刷新合并窗口（毫秒）：窗口内的多次刷新请求只执行一次 ipconfig /flushdns
+DNS_FLUSH_DEBOUNCE_MS = 300
+
+# 预设保存合并窗口（毫秒）：连续添加/删除预设只落盘一次；内容与上次写入相同则跳过
+PRESETS_SAVE_DEBOUNCE_MS = 500
+
+# 定时测速 DNS 解析缓存有效期（秒）：有效期内复用上次解析结果，超过 2 倍有效期的条目惰性淘汰
+SCHEDULED_DNS_CACHE_TTL_S = 900
+
+# IP 字面量（IPv4 点分 / 含 ':' 的 IPv6）：无需 DNS 解析
+_IPV4_LITERAL_RE = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}$")
+
+# 结果状态分类：一次扫描判断是否为失败类状态（标红）
+_BAD_STATUS_RE = re.compile("超时|不可达|失败|拒绝")
+
+# 行标签查找表：[斑马纹(偶/奇)][状态(无/可用/失败)]，预先构造好的元组，每行直接复用
+_ROW_TAGS: Tuple[Tuple[Tuple[str, ...], ...], ...] = tuple(
+    ((stripe,), (stripe, "ok"), (stripe, "bad")) for stripe in ("row_a", "row_b")
+)
+
 # 表格列宽配置（像素）
 # select: 选择列（复选框）
 # ip: IP地址列
@@ -85,6 +135,23 @@ COLUMN_WIDTHS = {
     "status": 120,
 }
 
+# 结果表列定义（导入时一次算好）：(列名, 表头, 宽度)
+_RESULT_TREE_COLUMNS: Tuple[Tuple[str, str, int], ...] = tuple(
+    (c, t, COLUMN_WIDTHS[c]) for c, t in (
+        ("select", "选择"),
+        ("ip", "IP 地址"),
+        ("domain", "域名"),
+        ("delay", "延迟 (ms)"),
+        ("jitter", "抖动 (ms)"),
+        ("stability", "稳定性"),
+        ("status", "状态"),
+    )
+)
+_RESULT_TREE_COLUMN_IDS: Tuple[str, ...] = tuple(c for c, _, _ in _RESULT_TREE_COLUMNS)
+
+# 远程源菜单：显示名 -> URL（URL 为空表示“自动”，按优先级尝试）
+_REMOTE_SOURCE_URLS: Dict[str, Optional[str]] = dict(REMOTE_HOSTS_SOURCE_CHOICES)
+
 # 按钮宽度配置（字符数）
 # remote_source: 远程源选择按钮
 # refresh_remote: 刷新远程 Hosts 按钮
@@ -157,11 +224,11 @@ PADDING_VALUES = {
 
 # 其他 UI 数值配置
 # tip_wraplength: 提示文字换行宽度（像素，推荐 300-350px）
-# resolver_max_workers: DNS 解析最大线程数（推荐 15-25）
+# resolver_max_workers: DNS 解析最大线程数（按 CPU 数计算：CPU×4，限制在 4-16；线程过多反而互相争用）
 # remote_source_button_max_length: 远程源按钮文字最大长度（字符，推荐 14-18）
 UI_OTHER_VALUES = {
     "tip_wraplength": 320,
-    "resolver_max_workers": 20,
+    "resolver_max_workers": max(4, min(16, (os.cpu_count() or 4) * 4)),
     "remote_source_button_max_length": 16,
 }
 
@@ -179,6 +246,117 @@ except Exception:
     ToastNotification = None
 
 
+# 颜色计算：主题颜色固定，同样的输入反复出现，缓存结果
+@functools.lru_cache(maxsize=256)
+def _hex_to_rgb(h: str) -> Tuple[int, int, int]:
+    h = h.lstrip("#")
+    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+
+
+@functools.lru_cache(maxsize=256)
+def _rgb_to_hex(rgb: Tuple[int, int, int]) -> str:
+    return "#%02x%02x%02x" % rgb
+
+
+@functools.lru_cache(maxsize=16)
+def _zebra_palette(bg: str, fg: str) -> Tuple[str, str]:
+    """斑马纹两种行色：两端颜色只解码一次，按各混合比例一并算出（主题不变时直接命中缓存）"""
+    rgb_a, rgb_b = _hex_to_rgb(bg), _hex_to_rgb(fg)
+    row_a, row_b = (
+        _rgb_to_hex(tuple(int(ca + (cb - ca) * t) for ca, cb in zip(rgb_a, rgb_b)))
+        for t in (ZEBRA_ROW_A_MIX_RATIO, ZEBRA_ROW_B_MIX_RATIO)
+    )
+    return row_a, row_b
+
+
+# 测速设置窗口各标签页：(标签名, 配置分组, 行)；行为 (类型, 键, 文本, 默认值, 提示, 校验)
+# 类型 entry=输入框 / check=复选框；输入框的校验为 (数值类型, 显示名, 最小值, 最大值, 微调步长)，复选框为 None
+# 步长须能从最小值走到默认值（如间隔 0.02 用 0.01），否则微调箭头回不到默认值
+_SPEED_SETTINGS_TABS: Tuple[Tuple[str, str, Tuple[Tuple[str, str, str, Any, Optional[str], Optional[tuple]], ...]], ...] = (
+    ("TCP 设置", "tcp", (
+        ("entry", "port", "端口:", 443, "(默认: 443)", (int, "TCP端口", 1, 65535, 1)),
+        ("entry", "attempts", "尝试次数:", 5, "(默认: 5, 推荐: 3-10)", (int, "TCP尝试次数", 1, 50, 1)),
+        ("entry", "timeout", "超时时间(秒):", 2.0, "(默认: 2.0, 推荐: 1.0-5.0)", (float, "TCP超时时间", 0.1, 60.0, 0.1)),
+        ("entry", "interval", "间隔时间(秒):", 0.02, "(默认: 0.02)", (float, "TCP间隔时间", 0.0, 10.0, 0.01)),
+    )),
+    ("TLS 设置", "tls", (
+        ("check", "enabled", "启用 TLS/SNI 验证", True, None, None),
+        ("entry", "timeout", "超时时间(秒):", 3.0, "(默认: 3.0, 推荐: 2.0-5.0)", (float, "TLS超时时间", 0.1, 60.0, 0.1)),
+        ("check", "verify_hostname", "验证主机名", False, None, None),
+        ("check", "strict", "严格模式 (TLS失败则判定IP不可用)", False, None, None),
+        ("entry", "try_hosts_limit", "尝试域名数量:", 3, "(默认: 3)", (int, "尝试域名数量", 1, 20, 1)),
+    )),
+    ("ICMP 设置", "icmp", (
+        ("check", "enabled", "启用 ICMP Ping", True, None, None),
+        ("entry", "timeout_ms", "超时时间(毫秒):", 2000, "(默认: 2000)", (int, "ICMP超时时间(毫秒)", 100, 60000, 100)),
+        ("check", "fallback_only", "仅在 TCP 失败时使用", True, None, None),
+    )),
+    ("重试设置", "retry", (
+        ("check", "enabled", "启用重试", True, None, None),
+        ("entry", "max_retries", "最大重试次数:", 2, "(默认: 2)", (int, "最大重试次数", 0, 20, 1)),
+        ("entry", "backoff_factor", "退避因子:", 1.5, "(默认: 1.5)", (float, "退避因子", 0.1, 10.0, 0.1)),
+    )),
+    ("高级设置", "advanced", (
+        ("check", "measure_jitter", "测量抖动 (Jitter)", True, None, None),
+        ("check", "calculate_stability", "计算稳定性分数", True, None, None),
+    )),
+)
+
+# 数值项校验表由上表导出：(配置分组, 键, 类型, 显示名, 最小值, 最大值)，按界面顺序校验并报告错误
+_SPEED_SETTINGS_NUMERIC: Tuple[Tuple[str, str, type, str, float, float], ...] = tuple(
+    (section, key, *check[:4])
+    for _, section, rows in _SPEED_SETTINGS_TABS
+    for _, key, _, _, _, check in rows
+    if check is not None
+)
+
+
+def _flatten_config(cfg: Any) -> Dict[str, Any]:
+    """两级配置展平为 {"分组.键": 值}；非 dict 的分组/配置直接忽略"""
+    if not isinstance(cfg, dict):
+        return {}
+    return {
+        f"{section}.{key}": value
+        for section, sub in cfg.items() if isinstance(sub, dict)
+        for key, value in sub.items()
+    }
+
+
+def _validate_number(value: str, kind: type, name: str, min_val: float, max_val: float) -> Any:
+    """验证整数 / 浮点数输入，返回转换后的值；无效时抛出 ValueError（异常信息即提示文本）"""
+    try:
+        val = kind(value.strip())
+    except ValueError:
+        what = "有效的整数" if kind is int else "有效的数字"
+        raise ValueError(f"{name} 必须是{what}（当前输入：'{value}'）") from None
+    if val < min_val or val > max_val:
+        raise ValueError(f"{name} 必须在 {min_val} 到 {max_val} 之间（当前值：{val}）")
+    return val
+
+
+# 逐键校验用：只放行可能成为合法数值的中间输入（允许清空、浮点允许尚未输完的 "1."），范围仍在保存时检查
+_PARTIAL_NUMBER_RE = {
+    int: re.compile(r"\d*"),
+    float: re.compile(r"\d*\.?\d*"),
+}
+
+
+# 批量设置 Treeview 列：参数为 (控件路径, {列名 表头 列宽 ...})
+_TV_SETUP_COLUMNS_TCL = (
+    "{w specs} {foreach {c h wd} $specs {$w heading $c -text $h; $w column $c -width $wd}}"
+)
+
+# 清空并批量填充 Treeview：参数为 (控件路径, {值列表 标签列表 ...})，整表一次 Tcl 调用完成
+_TV_FILL_TCL = (
+    "{w rows} {set c [$w children {}]; if {[llength $c]} {$w delete $c};"
+    " foreach {vals tags} $rows {$w insert {} end -values $vals -tags $tags}}"
+)
+
+
+def _looks_like_ip(host: str) -> bool:
+    return ":" in host or _IPV4_LITERAL_RE.match(host) is not None
+
+
 class HostsOptimizer(ttk.Frame):
     def __init__(self, master=None):
         super().__init__(master, padding=0)
@@ -208,18 +386,24 @@ class HostsOptimizer(ttk.Frame):
         self.master.geometry(f"{MAIN_WINDOW_WIDTH_PX}x{MAIN_WINDOW_HEIGHT_PX}")
         self.master.minsize(MIN_WINDOW_WIDTH_PX, MIN_WINDOW_HEIGHT_PX)
 
-        # 背景（玻璃拟态）
-        try:
-            self._bg = GlassBackground(self.master)
-        except Exception:
-            self._bg = None
+        # 背景（玻璃拟态）：推迟到窗口首次映射时再创建，启动时先把控件画出来
+        self._bg: Optional[GlassBackground] = None
+        self._bg_inited = False
+        self.master.bind("<Map>", self._init_bg, add="+")
 
         # 数据
         self.remote_hosts_data: List[Tuple[str, str]] = []
         self.smart_resolved_ips: List[Tuple[str, str]] = []
         self.custom_presets: List[str] = []
+        self._preset_set: Set[str] = set()  # 与 custom_presets 同步的成员集合，判重 O(1)
+        self._presets_saved: Optional[Tuple[str, ...]] = None  # 上次成功写入的预设快照
+        self._presets_save_after_id: Optional[str] = None
         # test_results: (ip, domain, delay_ms, status, selected, jitter, stability)
         self.test_results: List[Tuple[str, str, int, str, bool, float, float]] = []
+        # 增量维护的排序索引：[(rank_key, index_in_test_results), ...]，按 rank_key 有序
+        self._sorted_result_index: List[Tuple[tuple, int]] = []
+        # (ip, domain) -> test_results 下标，用于点击勾选时 O(1) 定位
+        self._result_index: Dict[Tuple[str, str], int] = {}
         self._test_metadata: Dict[str, Dict[str, Any]] = {}
 
         self.presets_file = user_data_path(APP_NAME, "presets.json")
@@ -231,14 +415,42 @@ class HostsOptimizer(ttk.Frame):
         self.executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
         self._stop_event = threading.Event()
         self._futures: List[concurrent.futures.Future] = []
+        self._speedtest_batch: Optional[concurrent.futures.Future] = None  # 高级测速批次（事件循环中的任务）
+        # 结果队列：后台收集线程 put，主线程 _pump_results 批量 drain（None 表示本轮结束）
+        self._result_queue: queue.SimpleQueue = queue.SimpleQueue()
 
         # 进度统计（按唯一 IP）
         self.total_ip_tests = 0
         self.completed_ip_tests = 0
         self._ip_to_domains: Dict[str, List[str]] = {}
 
-        # 结果排序节流
+        # 结果排序节流（结果表不可见时跳过刷新，记为 pending，重新显示时补刷）
         self._sort_after_id = None
+        self._sort_pending = False
+        # 结果表中可复用的行 iid（按显示顺序）
+        self._result_row_ids: List[str] = []
+        # 每个行 iid 上次写入的 (values, tags)：内容未变的行跳过 Tcl 调用
+        self._result_row_render: List[Tuple[tuple, Tuple[str, ...]]] = []
+        # 结果表虚拟滚动：Treeview 只持有可视区域的行，_result_offset 为首个可见结果在排序列表中的下标
+        self._result_offset = 0
+        self._result_window = 1
+        self._result_render_after_id: Optional[str] = None  # 滚动触发的合并重绘（after_idle）
+
+        # 状态栏节流：_status_pending 为待应用的 (text, bootstyle)；_status_style 为当前已应用的样式
+        self._status_after_id = None
+        self._status_pending: Optional[Tuple[str, str]] = None
+        self._status_style: Optional[str] = None
+
+        # Toast 去重：(title, message) -> 显示截止时间（monotonic）；同一条通知仍在显示时不再新建窗口
+        self._toast_until: Dict[Tuple[str, str], float] = {}
+
+        # hosts 写入 / DNS 刷新的单线程 I/O 执行器：不阻塞 Tk 主循环，多次点击按顺序执行
+        self._hosts_io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="hosts-io")
+
+        # DNS 刷新合并：窗口内的刷新请求只执行一次（_flush_notify 表示需要 Toast 提示）
+        self._flush_after_id = None
+        self._flush_pending = False
+        self._flush_notify = False
 
         # UI vars
         self.icmp_fallback_var = BooleanVar(value=True)
@@ -250,10 +462,27 @@ class HostsOptimizer(ttk.Frame):
         self._scheduled_test_enabled = False
         self._scheduled_test_interval = SCHEDULED_TEST_CONFIG.get("interval_minutes", 60)
         self._scheduled_test_auto_write = SCHEDULED_TEST_CONFIG.get("auto_write_best", True)
-        self._scheduled_test_after_id = None
+        # 定时测速调度：独立守护线程上的 sched.scheduler（单调时钟），到点后经 master.after(0) 回到主线程；
+        # 不占用 Tk 的定时器，也不受测速期间主线程繁忙影响
+        self._scheduled_test_event = None
+        self._sched_wake = threading.Event()
+        self._sched = sched.scheduler(time.monotonic, self._sched_delay)
+        threading.Thread(target=self._sched_loop, name="scheduled-timer", daemon=True).start()
         self._last_scheduled_test_time = None
         self._scheduled_test_domains: List[str] = []  # 定时测速的目标域名列表
         self._is_scheduled_test_running = False  # 标记当前是否是定时测速
+        # 常驻 asyncio 事件循环（后台守护线程）：定时测速的获取/解析流程都提交到这里，
+        # 不再每次 asyncio.run 新建/销毁事件循环
+        self._async_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._async_loop.run_forever, name="asyncio-loop", daemon=True).start()
+        # 定时测速线程池：给流程内的同步解析用；线程常驻复用
+        self._scheduled_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduled")
+        # 定时测速 DNS 缓存：domain -> (monotonic 时间戳, [(ip, domain), ...])
+        self._dns_cache: Dict[str, Tuple[float, List[Tuple[str, str]]]] = {}
+        
+        # 测速设置窗口：首次打开时创建，关闭时隐藏复用
+        self._speed_settings_window = None
+        self._speed_settings_show = None
         
         # 系统托盘相关
         self._tray_icon = None
@@ -270,11 +499,20 @@ class HostsOptimizer(ttk.Frame):
         # 【布局关键修复】：留出 padding 让背景透出来，lift 提升控件层级
         self.pack(fill=BOTH, expand=True, padx=15, pady=15)
         self.lift()
-        if self._bg:
-            try:
-                self._bg.lower()
-            except Exception:
-                pass
+
+    def _init_bg(self, _evt=None) -> None:
+        """首次 <Map> 时创建背景（子控件的 <Map> 也会冒泡到顶层窗口，用标志只执行一次）"""
+        if self._bg_inited:
+            return
+        self._bg_inited = True
+        try:
+            self._bg = GlassBackground(self.master)
+        except Exception:
+            self._bg = None
+            return
+        self._bg.lower()
+        # 首个 <Configure> 已在创建前发生，主动触发一次绘制
+        self._bg.refresh()
 
     # -----------------------------------------------------------------
     # 生命周期
@@ -297,6 +535,10 @@ class HostsOptimizer(ttk.Frame):
         # 停止定时测速
         self._stop_scheduled_test()
         
+        # 尚在合并窗口内的预设修改立即落盘
+        if self._presets_save_after_id is not None:
+            self._flush_presets()
+        
         # 停止当前测速
         self.stop_test = True
         self._stop_event.set()
@@ -306,6 +548,13 @@ class HostsOptimizer(ttk.Frame):
                 self.logger.debug("线程池已关闭")
             except Exception as e:
                 self.logger.warning(f"关闭线程池时出错: {e}")
+        # hosts I/O 执行器不取消：正在进行的写入应完整结束
+        self._hosts_io_executor.shutdown(wait=False)
+        try:
+            self._scheduled_executor.shutdown(wait=False, cancel_futures=True)
+        except TypeError:
+            self._scheduled_executor.shutdown(wait=False)
+        self._async_loop.call_soon_threadsafe(self._async_loop.stop)
         
         # 停止托盘
         if self._tray_icon:
@@ -364,54 +613,84 @@ class HostsOptimizer(ttk.Frame):
     # -----------------------------------------------------------------
     def _load_scheduled_test_config(self):
         """从用户配置文件加载定时测速设置"""
-        config_path = user_data_path(APP_NAME, "scheduled_test.json")
-        config = safe_read_json(config_path, None)
+        # 路径只计算一次；safe_read_json 在装有 orjson 时直接解析字节
+        self._scheduled_config_path = user_data_path(APP_NAME, "scheduled_test.json")
+        self._scheduled_config_saved: Optional[Dict[str, Any]] = None
+        config = safe_read_json(self._scheduled_config_path, None)
         if config:
             self._scheduled_test_enabled = config.get("enabled", False)
             self._scheduled_test_interval = config.get("interval_minutes", 60)
             self._scheduled_test_auto_write = config.get("auto_write_best", True)
             self._scheduled_test_domains = config.get("domains", [])
+            self._scheduled_config_saved = self._scheduled_test_config()
             self.logger.info(f"加载定时测速配置: enabled={self._scheduled_test_enabled}, interval={self._scheduled_test_interval}分钟, domains={len(self._scheduled_test_domains)}个")
             
             # 如果启用了定时测速，启动调度器
             if self._scheduled_test_enabled and self._scheduled_test_domains:
                 self._start_scheduled_test()
     
-    def _save_scheduled_test_config(self):
-        """保存定时测速配置"""
-        config_path = user_data_path(APP_NAME, "scheduled_test.json")
-        config = {
+    def _scheduled_test_config(self) -> Dict[str, Any]:
+        """当前定时测速设置（即落盘的 JSON 内容）"""
+        return {
             "enabled": self._scheduled_test_enabled,
             "interval_minutes": self._scheduled_test_interval,
             "auto_write_best": self._scheduled_test_auto_write,
-            "domains": self._scheduled_test_domains,
+            "domains": list(self._scheduled_test_domains),
         }
+    
+    def _save_scheduled_test_config(self):
+        """保存定时测速配置（与上次读/写的内容相同时跳过写盘）"""
+        config = self._scheduled_test_config()
+        if config == self._scheduled_config_saved:
+            self.logger.debug("定时测速配置未变化，跳过写入")
+            return
         try:
-            atomic_write_json(config_path, config)
+            atomic_write_json(self._scheduled_config_path, config)
+            self._scheduled_config_saved = config
             self.logger.info("定时测速配置已保存")
         except Exception as e:
             self.logger.error(f"保存定时测速配置失败: {e}")
     
+    def _sched_delay(self, timeout: float):
+        """sched 的等待函数：可被新加入/取消的事件提前唤醒。"""
+        if self._sched_wake.wait(timeout):
+            self._sched_wake.clear()
+
+    def _sched_loop(self):
+        """调度线程：执行到期事件；队列为空时等待新事件加入。"""
+        while True:
+            self._sched.run()
+            self._sched_wake.wait()
+            self._sched_wake.clear()
+
+    def _enter_scheduled_test(self):
+        """在 interval 分钟后触发一次定时测速"""
+        delay_s = self._scheduled_test_interval * 60
+        self._scheduled_test_event = self._sched.enter(
+            delay_s, 1, lambda: self.master.after(0, self._run_scheduled_test)
+        )
+        self._sched_wake.set()
+
     def _start_scheduled_test(self):
         """启动定时测速调度器"""
-        if self._scheduled_test_after_id:
+        if self._scheduled_test_event:
             return  # 已经在运行
         
-        interval_ms = self._scheduled_test_interval * 60 * 1000
-        self._scheduled_test_after_id = self.master.after(interval_ms, self._run_scheduled_test)
+        self._enter_scheduled_test()
         self.logger.info(f"定时测速已启动，间隔 {self._scheduled_test_interval} 分钟")
         
         # 更新状态栏
-        self.status_label.config(text=f"定时测速已启用（每 {self._scheduled_test_interval} 分钟）", bootstyle=INFO)
+        self._set_status(f"定时测速已启用（每 {self._scheduled_test_interval} 分钟）", INFO)
     
     def _stop_scheduled_test(self):
         """停止定时测速调度器"""
-        if self._scheduled_test_after_id:
+        if self._scheduled_test_event:
             try:
-                self.master.after_cancel(self._scheduled_test_after_id)
-            except Exception:
-                pass
-            self._scheduled_test_after_id = None
+                self._sched.cancel(self._scheduled_test_event)
+            except ValueError:
+                pass  # 事件已触发
+            self._scheduled_test_event = None
+            self._sched_wake.set()
             self.logger.info("定时测速已停止")
     
     def _run_scheduled_test(self):
@@ -432,59 +711,95 @@ class HostsOptimizer(ttk.Frame):
         
         # 使用配置的域名列表进行解析
         self.current_selected_presets = list(self._scheduled_test_domains)
-        self.is_github_selected = GITHUB_TARGET_DOMAIN in self._scheduled_test_domains
-        
-        # 如果包含 github.com，先刷新远程 Hosts
-        if self.is_github_selected:
-            self.logger.info("定时测速：刷新远程Hosts...")
-            threading.Thread(target=self._scheduled_fetch_and_test, daemon=True).start()
-        else:
-            # 直接解析并测速
-            self.logger.info("定时测速：解析域名IP...")
-            threading.Thread(target=self._scheduled_resolve_and_test, daemon=True).start()
+        # 一次扫描同时得到“是否含 github.com”与需要解析的其余域名
+        non_github_domains = [d for d in self.current_selected_presets if d != GITHUB_TARGET_DOMAIN]
+        self.is_github_selected = len(non_github_domains) != len(self.current_selected_presets)
+        
+        # 远程 Hosts 获取（含 github.com 时）与域名解析在同一个事件循环中并发进行；
+        # 提交到常驻事件循环执行，不再每次新建线程和事件循环
+        self.logger.info("定时测速：刷新远程Hosts并解析域名IP...")
+        fut = asyncio.run_coroutine_threadsafe(self._scheduled_pipeline(non_github_domains), self._async_loop)
+        fut.add_done_callback(self._scheduled_pipeline_done)
     
     def _schedule_next_test(self):
         """安排下一次定时测速"""
         if self._scheduled_test_enabled:
-            interval_ms = self._scheduled_test_interval * 60 * 1000
-            self._scheduled_test_after_id = self.master.after(interval_ms, self._run_scheduled_test)
+            self._enter_scheduled_test()
     
-    def _scheduled_fetch_and_test(self):
-        """定时测速：获取远程Hosts并测速"""
-        import asyncio
-        try:
-            async def fetch_async():
-                try:
-                    records, used_url = await self.remote_client.fetch_github_hosts_async(concurrent=True)
-                    self.remote_hosts_data = records
-                    self.logger.info(f"定时测速：获取到 {len(records)} 条远程Hosts记录")
-                except Exception as e:
-                    self.logger.error(f"定时测速：获取远程Hosts失败: {e}")
-            
-            asyncio.run(fetch_async())
-        except Exception as e:
-            self.logger.error(f"定时测速：获取远程Hosts异常: {e}")
+    def _scheduled_pipeline_done(self, fut: concurrent.futures.Future) -> None:
+        """获取 + 解析流程结束（在事件循环线程回调）：成功则回到主线程启动测速"""
+        if fut.cancelled():
+            return
+        e = fut.exception()
+        if e is not None:
+            self.logger.error(f"定时测速：解析域名失败: {e}")
+            self._schedule_next_test()
+            return
         
-        # 继续解析其他域名
-        self._scheduled_resolve_and_test()
+        # 在主线程中启动测速
+        self.master.after(0, self._start_scheduled_speed_test)
     
-    def _scheduled_resolve_and_test(self):
-        """定时测速：解析域名并测速"""
+    async def _scheduled_pipeline(self, non_github_domains: List[str]):
+        """远程 Hosts 获取与非 GitHub 域名解析并发执行"""
+        loop = asyncio.get_running_loop()
+        jobs = [loop.run_in_executor(self._scheduled_executor, self._scheduled_resolve, non_github_domains)]
+        if self.is_github_selected:
+            jobs.append(self._scheduled_fetch_remote())
+        await asyncio.gather(*jobs)
+    
+    async def _scheduled_fetch_remote(self):
+        """定时测速：获取远程Hosts（失败不影响其余域名的测速）"""
         try:
-            # 解析非 GitHub 域名
-            non_github_domains = [d for d in self._scheduled_test_domains if d != GITHUB_TARGET_DOMAIN]
-            if non_github_domains:
-                self.logger.info(f"定时测速：解析 {len(non_github_domains)} 个域名...")
-                resolved = self.resolver.resolve(non_github_domains)
-                self.smart_resolved_ips = resolved
-                self.logger.info(f"定时测速：解析到 {len(resolved)} 个IP")
-            
-            # 在主线程中启动测速
-            self.master.after(0, self._start_scheduled_speed_test)
+            records, used_url = await self.remote_client.fetch_github_hosts_async(concurrent=True)
+            self.remote_hosts_data = records
+            self.logger.info(f"定时测速：获取到 {len(records)} 条远程Hosts记录")
         except Exception as e:
-            self.logger.error(f"定时测速：解析域名失败: {e}")
-            self._schedule_next_test()
+            self.logger.error(f"定时测速：获取远程Hosts失败: {e}")
     
+    def _scheduled_resolve(self, non_github_domains: List[str]):
+        """定时测速：解析非 GitHub 域名"""
+        if non_github_domains:
+            # IP 字面量直接作为 (ip, ip) 使用，只把真正的主机名交给解析器（一次扫描分拣）
+            hostnames: List[str] = []
+            resolved: List[Tuple[str, str]] = []
+            for d in non_github_domains:
+                if _looks_like_ip(d):
+                    resolved.append((d, d))
+                else:
+                    hostnames.append(d)
+            self.logger.info(f"定时测速：解析 {len(hostnames)} 个域名...")
+            if hostnames:
+                resolved += self._resolve_cached(hostnames)
+            self.smart_resolved_ips = resolved
+            self.logger.info(f"定时测速：解析到 {len(resolved)} 个IP")
+    
+    def _resolve_cached(self, domains: List[str], ttl: float = SCHEDULED_DNS_CACHE_TTL_S) -> List[Tuple[str, str]]:
+        """带 TTL 的域名解析：命中缓存的域名直接复用，未命中的合并为一次 resolver.resolve。
+
+        解析失败（无结果）的域名不缓存，下次仍会重新解析；结果按 domains 的顺序返回。
+        """
+        now = time.monotonic()
+        cache = self._dns_cache
+        misses = [d for d in domains if d not in cache or now - cache[d][0] >= ttl]
+        if misses:
+            fresh: Dict[str, List[Tuple[str, str]]] = {}
+            for ip, dom in self.resolver.resolve(misses):
+                fresh.setdefault(dom, []).append((ip, dom))
+            for dom, rows in fresh.items():
+                cache[dom] = (now, rows)
+            self.logger.debug(f"DNS缓存：命中 {len(domains) - len(misses)} 个，解析 {len(misses)} 个")
+
+        # 惰性淘汰过旧条目
+        for dom in [d for d, (ts, _) in cache.items() if now - ts >= 2 * ttl]:
+            del cache[dom]
+
+        res: List[Tuple[str, str]] = []
+        for d in domains:
+            ent = cache.get(d)
+            if ent is not None and now - ent[0] < ttl:
+                res.extend(ent[1])
+        return res
+
     def _start_scheduled_speed_test(self):
         """在主线程中启动定时测速"""
         if self.remote_hosts_data or self.smart_resolved_ips:
@@ -602,25 +917,36 @@ class HostsOptimizer(ttk.Frame):
         domain_tree.pack(side=LEFT, fill=BOTH, expand=True)
         scrollbar.config(command=domain_tree.yview)
         
-        # 域名选择状态
-        domain_selected: Dict[str, BooleanVar] = {}
+        # 域名选择状态（已选集合先转 set，避免每个预设都线性扫描一次列表）
+        scheduled = set(self._scheduled_test_domains)
+        domain_selected: Dict[str, bool] = {d: d in scheduled for d in self.custom_presets}
         
-        # 填充域名列表（从预设列表获取）
-        for domain in self.custom_presets:
-            is_selected = domain in self._scheduled_test_domains
-            domain_selected[domain] = is_selected
-            check_mark = "✓" if is_selected else "□"
-            domain_tree.insert("", "end", values=[check_mark, domain], iid=domain)
+        # 填充域名列表（从预设列表获取）：先整体算好行，再一次性插入
+        insert = domain_tree.insert
+        for domain, is_selected in domain_selected.items():
+            insert("", "end", values=("✓" if is_selected else "□", domain), iid=domain)
+        
+        # 已选数量随勾选增量维护（普通 bool 状态，无需为每个域名创建 Tcl 变量，也无需每次全量统计）
+        selected_n = sum(domain_selected.values())
+        count_after_id: Optional[str] = None
+        
+        def set_selected(domain: str, selected: bool) -> None:
+            """更新单个域名的选择状态；状态未变化时不触碰 Treeview。"""
+            nonlocal selected_n
+            if domain_selected.get(domain) == selected:
+                return
+            domain_selected[domain] = selected
+            selected_n += 1 if selected else -1
+            # 只改“选择”列：不必重传未变化的域名文本
+            domain_tree.set(domain, "selected", "✓" if selected else "□")
         
         def toggle_domain(event):
             """切换域名选择状态"""
             item = domain_tree.identify_row(event.y)
             if not item:
                 return
-            domain = item  # iid 就是域名
-            domain_selected[domain] = not domain_selected.get(domain, False)
-            check_mark = "✓" if domain_selected[domain] else "□"
-            domain_tree.item(item, values=[check_mark, domain])
+            set_selected(item, not domain_selected.get(item, False))  # iid 就是域名
+            schedule_count_update()
         
         domain_tree.bind("<Button-1>", toggle_domain)
         
@@ -629,34 +955,42 @@ class HostsOptimizer(ttk.Frame):
         quick_btn_frame.pack(fill=X, pady=(10, 0))
         
         def select_all():
-            for domain in self.custom_presets:
-                domain_selected[domain] = True
-                domain_tree.item(domain, values=["✓", domain])
+            for domain in domain_selected:
+                set_selected(domain, True)
+            schedule_count_update()
         
         def select_none():
-            for domain in self.custom_presets:
-                domain_selected[domain] = False
-                domain_tree.item(domain, values=["□", domain])
+            for domain in domain_selected:
+                set_selected(domain, False)
+            schedule_count_update()
+        
+        # “仅GitHub”判定在窗口打开时算一次，点击时不再逐个 lower()
+        github_mask = {d: "github" in d.lower() for d in domain_selected}
         
         def select_github():
-            for domain in self.custom_presets:
-                is_github = "github" in domain.lower()
-                domain_selected[domain] = is_github
-                check_mark = "✓" if is_github else "□"
-                domain_tree.item(domain, values=[check_mark, domain])
+            for domain, is_github in github_mask.items():
+                set_selected(domain, is_github)
+            schedule_count_update()
         
         ttk.Button(quick_btn_frame, text="全选", command=select_all, bootstyle="info-outline", width=8).pack(side=LEFT, padx=2)
         ttk.Button(quick_btn_frame, text="全不选", command=select_none, bootstyle="secondary-outline", width=8).pack(side=LEFT, padx=2)
         ttk.Button(quick_btn_frame, text="仅GitHub", command=select_github, bootstyle="success-outline", width=10).pack(side=LEFT, padx=2)
         
         # 已选数量提示
-        selected_count_var = StringVar(value=f"已选择 {sum(1 for v in domain_selected.values() if v)} 个域名")
+        selected_count_var = StringVar(value=f"已选择 {selected_n} 个域名")
         selected_label = ttk.Label(quick_btn_frame, textvariable=selected_count_var, font=("Segoe UI", 9), bootstyle="info")
         selected_label.pack(side=RIGHT)
         
         def update_selected_count(*args):
-            count = sum(1 for v in domain_selected.values() if v)
-            selected_count_var.set(f"已选择 {count} 个域名")
+            nonlocal count_after_id
+            count_after_id = None
+            selected_count_var.set(f"已选择 {selected_n} 个域名")
+        
+        def schedule_count_update() -> None:
+            """合并连续的勾选操作：空闲时只统计一次已选数量。"""
+            nonlocal count_after_id
+            if count_after_id is None:
+                count_after_id = settings_window.after_idle(update_selected_count)
         
         # 状态显示
         status_frame = ttk.Frame(container)
@@ -749,49 +1083,62 @@ class HostsOptimizer(ttk.Frame):
             style.configure("Card.TFrame", background=style.colors.bg)
         except Exception:
             pass
+        self._refresh_theme_colors()
+        # 主题切换时重新读取一次；该虚拟事件会发给每个控件，回调里只处理顶层窗口那一次
+        self.master.bind("<<ThemeChanged>>", self._refresh_theme_colors, add="+")
 
-    def _hex_to_rgb(self, h: str):
-        h = h.lstrip("#")
-        return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
-
-    def _rgb_to_hex(self, rgb):
-        return "#%02x%02x%02x" % rgb
-
-    def _mix(self, a: str, b: str, t: float) -> str:
-        ra, ga, ba = self._hex_to_rgb(a)
-        rb, gb, bb = self._hex_to_rgb(b)
-        r = int(ra + (rb - ra) * t)
-        g = int(ga + (gb - ga) * t)
-        b2 = int(ba + (bb - ba) * t)
-        return self._rgb_to_hex((r, g, b2))
+    def _refresh_theme_colors(self, evt=None) -> None:
+        """缓存当前主题的 (bg, fg, success, danger)，避免每个 Treeview 都重新查询主题"""
+        if evt is not None and evt.widget is not self.master:
+            return
+        try:
+            colors = ttk.Style().colors
+            self._theme_colors: Optional[Tuple[str, str, str, str]] = (
+                colors.bg, colors.fg, colors.success, colors.danger,
+            )
+        except Exception:
+            self._theme_colors = None
 
     def _setup_treeview_tags(self, tv: ttk.Treeview):
         """给 Treeview 加：斑马纹 + 状态色（可用/超时）。"""
+        if not self._theme_colors:
+            return
+        bg, fg, success, danger = self._theme_colors
         try:
-            style = ttk.Style()
-            bg = style.colors.bg
-            fg = style.colors.fg
-
-            row_a = self._mix(bg, fg, ZEBRA_ROW_A_MIX_RATIO)
-            row_b = self._mix(bg, fg, ZEBRA_ROW_B_MIX_RATIO)
+            row_a, row_b = _zebra_palette(bg, fg)
 
             tv.tag_configure("row_a", background=row_a)
             tv.tag_configure("row_b", background=row_b)
 
-            tv.tag_configure("ok", foreground=style.colors.success)
-            tv.tag_configure("bad", foreground=style.colors.danger)
+            tv.tag_configure("ok", foreground=success)
+            tv.tag_configure("bad", foreground=danger)
         except Exception:
             pass
 
-    def _tv_insert(self, tv: ttk.Treeview, values, index: int, status: Optional[str] = None):
-        tags = ["row_a" if index % 2 == 0 else "row_b"]
+    @staticmethod
+    def _row_tags(index: int, status: Optional[str] = None) -> Tuple[str, ...]:
+        """行标签：斑马纹 + 状态色（从 _ROW_TAGS 取共享元组，不逐行新建列表）。"""
+        state = 0
         if status:
             st = str(status)
-            if ("超时" in st) or ("不可达" in st) or ("失败" in st) or ("拒绝" in st):
-                tags.append("bad")
+            if _BAD_STATUS_RE.search(st):
+                state = 2
             elif st.startswith("可用") or "可用(ICMP)" in st:
-                tags.append("ok")
-        tv.insert("", "end", values=values, tags=tags)
+                state = 1
+        return _ROW_TAGS[index & 1][state]
+
+    def _tv_insert(self, tv: ttk.Treeview, values, index: int, status: Optional[str] = None):
+        return tv.insert("", "end", values=values, tags=self._row_tags(index, status))
+
+    def _tv_fill(self, tv: ttk.Treeview, rows) -> None:
+        """清空并批量填充 Treeview：删除与全部插入合并为一次 Tcl 调用，避免逐行往返。"""
+        stripes = _ROW_TAGS[0][0], _ROW_TAGS[1][0]
+        flat: List[Any] = []
+        append = flat.append
+        for idx, values in enumerate(rows):
+            append(tuple(values))
+            append(stripes[idx & 1])
+        tv.tk.call("apply", _TV_FILL_TCL, str(tv), tuple(flat))
 
     # -----------------------------------------------------------------
     # UI
@@ -887,15 +1234,12 @@ class HostsOptimizer(ttk.Frame):
         self.more_btn["menu"] = more_menu
         self._more_menu = more_menu  # 保存引用以便动态更新
 
-        # ToolTip（不影响功能）
-        try:
-            ToolTip(self.remote_source_btn, text="选择远程 hosts 数据源（默认按优先级自动选择）")
-            ToolTip(self.refresh_remote_btn, text="从远程源获取 GitHub 相关 hosts 记录")
-            ToolTip(self.start_test_btn, text="对当前 IP 列表进行并发测速并排序")
-            ToolTip(self.pause_test_btn, text="停止当前测速任务")
-            ToolTip(self.more_btn, text="更多工具：刷新 DNS / 查看 hosts / 关于")
-        except Exception:
-            pass
+        # ToolTip（不影响功能）：首次悬停时才创建
+        self._attach_tooltip(self.remote_source_btn, "选择远程 hosts 数据源（默认按优先级自动选择）")
+        self._attach_tooltip(self.refresh_remote_btn, "从远程源获取 GitHub 相关 hosts 记录")
+        self._attach_tooltip(self.start_test_btn, "对当前 IP 列表进行并发测速并排序")
+        self._attach_tooltip(self.pause_test_btn, "停止当前测速任务")
+        self._attach_tooltip(self.more_btn, "更多工具：刷新 DNS / 查看 hosts / 关于")
 
         # --- Body ---
         body = ttk.Frame(self)
@@ -973,22 +1317,25 @@ class HostsOptimizer(ttk.Frame):
         right_card.pack(fill=BOTH, expand=True)
 
         # 结果列表 - 保留原版文字
-        self.result_tree = ttk.Treeview(right_card, columns=["select", "ip", "domain", "delay", "jitter", "stability", "status"], show="headings")
-        cols = [
-            ("select", "选择", COLUMN_WIDTHS["select"]),
-            ("ip", "IP 地址", COLUMN_WIDTHS["ip"]),
-            ("domain", "域名", COLUMN_WIDTHS["domain"]),
-            ("delay", "延迟 (ms)", COLUMN_WIDTHS["delay"]),
-            ("jitter", "抖动 (ms)", COLUMN_WIDTHS["jitter"]),
-            ("stability", "稳定性", COLUMN_WIDTHS["stability"]),
-            ("status", "状态", COLUMN_WIDTHS["status"]),
-        ]
-        for c, t, w in cols:
+        # 结果表：只渲染可视区域的行（虚拟滚动），结果再多也只有一屏的 Treeview 行
+        result_frame = ttk.Frame(right_card)
+        result_frame.pack(fill=BOTH, expand=True, pady=(0, 10))
+        self.result_scroll = ttk.Scrollbar(result_frame, orient=VERTICAL, command=self._on_result_scroll)
+        self.result_scroll.pack(side=RIGHT, fill=Y)
+        self.result_tree = ttk.Treeview(result_frame, columns=_RESULT_TREE_COLUMN_IDS, show="headings")
+        for c, t, w in _RESULT_TREE_COLUMNS:
             self.result_tree.heading(c, text=t)
             self.result_tree.column(c, width=w, anchor="center" if c == "select" else "w")
-        self.result_tree.pack(fill=BOTH, expand=True, pady=(0, 10))
+        self.result_tree.pack(side=LEFT, fill=BOTH, expand=True)
         self._setup_treeview_tags(self.result_tree)
         self.result_tree.bind("<Button-1>", self.on_tree_click)
+        self.result_tree.bind("<Map>", self._on_result_tree_map, add="+")
+        # 从托盘恢复时 deiconify 只向顶层窗口发 <Map>（子控件不会重新收到），顶层也需补刷新
+        self.master.bind("<Map>", self._on_result_tree_map, add="+")
+        self.result_tree.bind("<Configure>", self._on_result_tree_configure, add="+")
+        self.result_tree.bind("<MouseWheel>", self._on_result_wheel)
+        self.result_tree.bind("<Button-4>", self._on_result_wheel)
+        self.result_tree.bind("<Button-5>", self._on_result_wheel)
 
         action_bar = ttk.Frame(right_card)
         action_bar.pack(fill=X)
@@ -1030,11 +1377,38 @@ class HostsOptimizer(ttk.Frame):
         self.status_label = ttk.Label(statusbar, text="就绪", bootstyle=INFO)
         self.status_label.pack(side=RIGHT, padx=(10, 0))
 
+    @property
+    def speed_test_config(self) -> Dict[str, Any]:
+        return self._speed_test_config
+
+    @speed_test_config.setter
+    def speed_test_config(self, cfg: Dict[str, Any]) -> None:
+        """替换测速配置时同步生成扁平视图 _flat_config（"tcp.port" -> 值），读取处不再逐层 .get()"""
+        self._speed_test_config = cfg
+        self._flat_config = _flatten_config(cfg)
+
+    def _attach_tooltip(self, widget, text: str) -> None:
+        """延迟创建 ToolTip：启动时只绑定一个一次性的 <Enter>，首次悬停才实例化。
+
+        ToolTip 构造时会用自己的处理函数重新绑定 <Enter>（替换掉这里的一次性绑定），
+        随后把本次事件转交给它，使首次悬停也能正常显示。
+        """
+        def on_first_enter(event):
+            try:
+                tip = ToolTip(widget, text=text)
+            except Exception:
+                return
+            enter = getattr(tip, "enter", None)
+            if enter:
+                enter(event)
+
+        widget.bind("<Enter>", on_first_enter, add="+")
+
     def _create_treeview(self, parent, cols, headers, widths):
         tv = ttk.Treeview(parent, columns=cols, show="headings")
-        for c, h, w in zip(cols, headers, widths):
-            tv.heading(c, text=h)
-            tv.column(c, width=w)
+        # 所有列的表头/列宽在一次 Tcl 调用内设置（lambda 体不变，Tcl 会缓存其字节码）
+        specs = tuple(x for spec in zip(cols, headers, widths) for x in spec)
+        tv.tk.call("apply", _TV_SETUP_COLUMNS_TCL, str(tv), specs)
         tv.pack(fill=BOTH, expand=True)
         self._setup_treeview_tags(tv)
         return tv
@@ -1044,16 +1418,25 @@ class HostsOptimizer(ttk.Frame):
     # -----------------------------------------------------------------
     def _toast(self, title: str, message: str, *, bootstyle: str = "info", duration: Optional[int] = None):
         if duration is None:
-            duration = UI_CONFIG.get("toast", {}).get("default_duration_ms", 1800)
+            duration = TOAST_DEFAULT_DURATION_MS
+        if not ToastNotification:
+            return
+        # 每条 Toast 都是一个新的 Toplevel：相同内容仍在显示时直接跳过，批量操作不堆叠重复窗口
+        key = (title, message)
+        now = time.monotonic()
+        if self._toast_until.get(key, 0.0) > now:
+            return
+        if len(self._toast_until) > 32:
+            self._toast_until = {k: t for k, t in self._toast_until.items() if t > now}
+        self._toast_until[key] = now + duration / 1000.0
         try:
-            if ToastNotification:
-                ToastNotification(
-                    title=title,
-                    message=message,
-                    duration=duration,
-                    bootstyle=bootstyle,
-                ).show_toast()
-                self.logger.debug(f"Toast通知: {title} - {message}")
+            ToastNotification(
+                title=title,
+                message=message,
+                duration=duration,
+                bootstyle=bootstyle,
+            ).show_toast()
+            self.logger.debug(f"Toast通知: {title} - {message}")
         except Exception as e:
             self.logger.warning(f"Toast通知显示失败: {e}", exc_info=True)
 
@@ -1080,8 +1463,12 @@ class HostsOptimizer(ttk.Frame):
             messagebox.showinfo("关于", "SmartHostsTool\\nModern Glass UI")
 
     def show_speed_test_settings(self):
-        """显示测速设置窗口"""
+        """显示测速设置窗口（首次打开时创建并缓存；之后只按当前配置重新填充数值并显示）"""
         self.logger.info("打开测速设置窗口")
+        win = self._speed_settings_window
+        if win is not None and win.winfo_exists():
+            self._speed_settings_show()
+            return
         
         # 创建设置窗口
         settings_window = ttk.Toplevel(self.master)
@@ -1109,6 +1496,14 @@ class HostsOptimizer(ttk.Frame):
             except Exception:
                 pass
         
+        def hide():
+            """关闭即隐藏：控件保留，下次打开无需重建"""
+            try:
+                settings_window.grab_release()
+            except Exception:
+                pass
+            settings_window.withdraw()
+        
         # 主容器 - 简化布局
         main_container = ttk.Frame(settings_window, padding=15)
         main_container.pack(fill=BOTH, expand=True)
@@ -1127,325 +1522,63 @@ class HostsOptimizer(ttk.Frame):
         notebook = ttk.Notebook(main_container)
         notebook.pack(fill=BOTH, expand=True, pady=(0, 15))
         
-        # 确保Notebook有足够的高度来显示标签
-        notebook.update_idletasks()
-        
-        # 配置变量 - 必须在函数作用域内定义，以便保存函数访问
-        tcp_config = self.speed_test_config.get("tcp", {})
-        tls_config = self.speed_test_config.get("tls", {})
-        icmp_config = self.speed_test_config.get("icmp", {})
-        retry_config = self.speed_test_config.get("retry", {})
-        advanced_config = self.speed_test_config.get("advanced", {})
-        
-        # 先创建所有Frame，确保它们都有内容
-        
-        # TCP 配置页
-        tcp_frame = ttk.Frame(notebook, padding=20)
-        # 配置grid权重，确保内容正确显示
-        tcp_frame.grid_columnconfigure(0, weight=0)
-        tcp_frame.grid_columnconfigure(1, weight=0)
-        tcp_frame.grid_columnconfigure(2, weight=1)
-        
-        ttk.Label(tcp_frame, text="端口:", font=("Segoe UI", 10)).grid(row=0, column=0, sticky=W, pady=12, padx=10)
-        port_var = StringVar(value=str(tcp_config.get("port", 443)))
-        port_entry = ttk.Entry(tcp_frame, textvariable=port_var, width=20)
-        port_entry.grid(row=0, column=1, sticky=W, padx=10)
-        ttk.Label(tcp_frame, text="(默认: 443)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=0, column=2, sticky=W, padx=10)
-        
-        ttk.Label(tcp_frame, text="尝试次数:", font=("Segoe UI", 10)).grid(row=1, column=0, sticky=W, pady=12, padx=10)
-        attempts_var = StringVar(value=str(tcp_config.get("attempts", 5)))
-        attempts_entry = ttk.Entry(tcp_frame, textvariable=attempts_var, width=20)
-        attempts_entry.grid(row=1, column=1, sticky=W, padx=10)
-        ttk.Label(tcp_frame, text="(默认: 5, 推荐: 3-10)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=1, column=2, sticky=W, padx=10)
-        
-        ttk.Label(tcp_frame, text="超时时间(秒):", font=("Segoe UI", 10)).grid(row=2, column=0, sticky=W, pady=12, padx=10)
-        timeout_var = StringVar(value=str(tcp_config.get("timeout", 2.0)))
-        timeout_entry = ttk.Entry(tcp_frame, textvariable=timeout_var, width=20)
-        timeout_entry.grid(row=2, column=1, sticky=W, padx=10)
-        ttk.Label(tcp_frame, text="(默认: 2.0, 推荐: 1.0-5.0)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=2, column=2, sticky=W, padx=10)
-        
-        ttk.Label(tcp_frame, text="间隔时间(秒):", font=("Segoe UI", 10)).grid(row=3, column=0, sticky=W, pady=12, padx=10)
-        interval_var = StringVar(value=str(tcp_config.get("interval", 0.02)))
-        interval_entry = ttk.Entry(tcp_frame, textvariable=interval_var, width=20)
-        interval_entry.grid(row=3, column=1, sticky=W, padx=10)
-        ttk.Label(tcp_frame, text="(默认: 0.02)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=3, column=2, sticky=W, padx=10)
-        
-        # 添加TCP标签页到Notebook
-        notebook.add(tcp_frame, text="TCP 设置")
-        
-        # TLS 配置页
-        tls_frame = ttk.Frame(notebook, padding=20)
-        # 配置grid权重
-        tls_frame.grid_columnconfigure(0, weight=0)
-        tls_frame.grid_columnconfigure(1, weight=0)
-        tls_frame.grid_columnconfigure(2, weight=1)
-        
-        tls_enabled_var = BooleanVar(value=tls_config.get("enabled", True))
-        tls_check = ttk.Checkbutton(
-            tls_frame,
-            text="启用 TLS/SNI 验证",
-            variable=tls_enabled_var
-        )
-        tls_check.grid(row=0, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        ttk.Label(tls_frame, text="超时时间(秒):", font=("Segoe UI", 10)).grid(row=1, column=0, sticky=W, pady=12, padx=10)
-        tls_timeout_var = StringVar(value=str(tls_config.get("timeout", 3.0)))
-        tls_timeout_entry = ttk.Entry(tls_frame, textvariable=tls_timeout_var, width=20)
-        tls_timeout_entry.grid(row=1, column=1, sticky=W, padx=10)
-        ttk.Label(tls_frame, text="(默认: 3.0, 推荐: 2.0-5.0)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=1, column=2, sticky=W, padx=10)
-        
-        verify_hostname_var = BooleanVar(value=tls_config.get("verify_hostname", False))
-        verify_check = ttk.Checkbutton(
-            tls_frame,
-            text="验证主机名",
-            variable=verify_hostname_var
-        )
-        verify_check.grid(row=2, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        strict_var = BooleanVar(value=tls_config.get("strict", False))
-        strict_check = ttk.Checkbutton(
-            tls_frame,
-            text="严格模式 (TLS失败则判定IP不可用)",
-            variable=strict_var
-        )
-        strict_check.grid(row=3, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        ttk.Label(tls_frame, text="尝试域名数量:", font=("Segoe UI", 10)).grid(row=4, column=0, sticky=W, pady=12, padx=10)
-        try_hosts_limit_var = StringVar(value=str(tls_config.get("try_hosts_limit", 3)))
-        try_hosts_limit_entry = ttk.Entry(tls_frame, textvariable=try_hosts_limit_var, width=20)
-        try_hosts_limit_entry.grid(row=4, column=1, sticky=W, padx=10)
-        ttk.Label(tls_frame, text="(默认: 3)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=4, column=2, sticky=W, padx=10)
-        
-        # 添加TLS标签页到Notebook
-        notebook.add(tls_frame, text="TLS 设置")
-        
-        # ICMP 配置页
-        icmp_frame = ttk.Frame(notebook, padding=20)
-        # 配置grid权重
-        icmp_frame.grid_columnconfigure(0, weight=0)
-        icmp_frame.grid_columnconfigure(1, weight=0)
-        icmp_frame.grid_columnconfigure(2, weight=1)
-        
-        icmp_enabled_var = BooleanVar(value=icmp_config.get("enabled", True))
-        icmp_check = ttk.Checkbutton(
-            icmp_frame,
-            text="启用 ICMP Ping",
-            variable=icmp_enabled_var
-        )
-        icmp_check.grid(row=0, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        ttk.Label(icmp_frame, text="超时时间(毫秒):", font=("Segoe UI", 10)).grid(row=1, column=0, sticky=W, pady=12, padx=10)
-        icmp_timeout_var = StringVar(value=str(icmp_config.get("timeout_ms", 2000)))
-        icmp_timeout_entry = ttk.Entry(icmp_frame, textvariable=icmp_timeout_var, width=20)
-        icmp_timeout_entry.grid(row=1, column=1, sticky=W, padx=10)
-        ttk.Label(icmp_frame, text="(默认: 2000)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=1, column=2, sticky=W, padx=10)
-        
-        fallback_only_var = BooleanVar(value=icmp_config.get("fallback_only", True))
-        fallback_check = ttk.Checkbutton(
-            icmp_frame,
-            text="仅在 TCP 失败时使用",
-            variable=fallback_only_var
-        )
-        fallback_check.grid(row=2, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        # 添加ICMP标签页到Notebook
-        notebook.add(icmp_frame, text="ICMP 设置")
-        
-        # 重试配置页
-        retry_frame = ttk.Frame(notebook, padding=20)
-        # 配置grid权重
-        retry_frame.grid_columnconfigure(0, weight=0)
-        retry_frame.grid_columnconfigure(1, weight=0)
-        retry_frame.grid_columnconfigure(2, weight=1)
-        
-        retry_enabled_var = BooleanVar(value=retry_config.get("enabled", True))
-        retry_check = ttk.Checkbutton(
-            retry_frame,
-            text="启用重试",
-            variable=retry_enabled_var
-        )
-        retry_check.grid(row=0, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        ttk.Label(retry_frame, text="最大重试次数:", font=("Segoe UI", 10)).grid(row=1, column=0, sticky=W, pady=12, padx=10)
-        max_retries_var = StringVar(value=str(retry_config.get("max_retries", 2)))
-        max_retries_entry = ttk.Entry(retry_frame, textvariable=max_retries_var, width=20)
-        max_retries_entry.grid(row=1, column=1, sticky=W, padx=10)
-        ttk.Label(retry_frame, text="(默认: 2)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=1, column=2, sticky=W, padx=10)
-        
-        ttk.Label(retry_frame, text="退避因子:", font=("Segoe UI", 10)).grid(row=2, column=0, sticky=W, pady=12, padx=10)
-        backoff_factor_var = StringVar(value=str(retry_config.get("backoff_factor", 1.5)))
-        backoff_factor_entry = ttk.Entry(retry_frame, textvariable=backoff_factor_var, width=20)
-        backoff_factor_entry.grid(row=2, column=1, sticky=W, padx=10)
-        ttk.Label(retry_frame, text="(默认: 1.5)", font=("Segoe UI", 9), bootstyle="secondary").grid(row=2, column=2, sticky=W, padx=10)
-        
-        # 添加重试标签页到Notebook
-        notebook.add(retry_frame, text="重试设置")
-        
-        # 高级配置页
-        advanced_frame = ttk.Frame(notebook, padding=20)
-        # 配置grid权重
-        advanced_frame.grid_columnconfigure(0, weight=1)
-        
-        measure_jitter_var = BooleanVar(value=advanced_config.get("measure_jitter", True))
-        jitter_check = ttk.Checkbutton(
-            advanced_frame,
-            text="测量抖动 (Jitter)",
-            variable=measure_jitter_var
-        )
-        jitter_check.grid(row=0, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        calculate_stability_var = BooleanVar(value=advanced_config.get("calculate_stability", True))
-        stability_check = ttk.Checkbutton(
-            advanced_frame,
-            text="计算稳定性分数",
-            variable=calculate_stability_var
-        )
-        stability_check.grid(row=1, column=0, columnspan=3, sticky=W, pady=12, padx=10)
-        
-        # 添加高级设置标签页到Notebook
-        notebook.add(advanced_frame, text="高级设置")
-        
-        # 立即更新Notebook以确保标签页显示
-        notebook.update_idletasks()
-        settings_window.update_idletasks()
-        settings_window.update()
-        
-        # 验证所有标签页都已添加
-        tab_count = len(notebook.tabs())
-        try:
-            tab_names = [notebook.tab(tab, 'text') for tab in notebook.tabs()]
-        except Exception as e:
-            tab_names = []
-            self.logger.warning(f"获取标签页名称失败: {e}")
-        
-        self.logger.info(f"测速设置窗口已创建，共 {tab_count} 个标签页")
-        if tab_names:
-            self.logger.info(f"标签页名称列表: {tab_names}")
-        
-        if tab_count != 5:
-            self.logger.error(f"标签页数量异常！期望5个，实际{tab_count}个")
-            if tab_names:
-                self.logger.error(f"已添加的标签页: {tab_names}")
-            # 尝试多次强制刷新
-            for i in range(3):
-                settings_window.update()
-                notebook.update()
-                settings_window.update_idletasks()
-                tab_count_after = len(notebook.tabs())
-                if tab_count_after == 5:
-                    self.logger.info(f"第{i+1}次刷新后标签页数量恢复正常: {tab_count_after}")
-                    break
-                elif tab_count_after != tab_count:
-                    self.logger.info(f"第{i+1}次刷新后标签页数量变化: {tab_count} -> {tab_count_after}")
-        else:
-            self.logger.info("所有标签页已成功添加并显示")
+        # 各标签页按 _SPEED_SETTINGS_TABS 统一生成；变量按 (配置分组, 键) 收集，回填与校验都遍历同一张表
+        vars_by_key: Dict[Tuple[str, str], Any] = {}
+        fields = []  # (变量, 配置分组, 键, 默认值)
+        # 数值输入框在 Tcl 层逐键拦截非法字符：每种数值类型只注册一次回调
+        vcmds = {
+            kind: (settings_window.register(lambda text, _m=pattern.fullmatch: _m(text) is not None), "%P")
+            for kind, pattern in _PARTIAL_NUMBER_RE.items()
+        }
+        for tab_text, section, rows in _SPEED_SETTINGS_TABS:
+            frame = ttk.Frame(notebook, padding=20)
+            # 配置grid权重：列权重默认即为 0，只需设置占满剩余宽度的那一列
+            # （有输入框的页由第 2 列提示文字占满，只有复选框的页由第 0 列占满）
+            stretch_col = 2 if any(kind == "entry" for kind, *_ in rows) else 0
+            frame.grid_columnconfigure(stretch_col, weight=1)
+            for row, (kind, key, text, default, hint, check) in enumerate(rows):
+                if kind == "entry":
+                    var = StringVar()
+                    num_kind, _, min_val, max_val, step = check
+                    ttk.Label(frame, text=text, font=("Segoe UI", 10)).grid(row=row, column=0, sticky=W, pady=12, padx=10)
+                    ttk.Spinbox(
+                        frame, textvariable=var, width=18, from_=min_val, to=max_val,
+                        increment=step,
+                        validate="key", validatecommand=vcmds[num_kind],
+                    ).grid(row=row, column=1, sticky=W, padx=10)
+                    ttk.Label(frame, text=hint, font=("Segoe UI", 9), bootstyle="secondary").grid(row=row, column=2, sticky=W, padx=10)
+                else:
+                    var = BooleanVar()
+                    ttk.Checkbutton(frame, text=text, variable=var).grid(row=row, column=0, columnspan=3, sticky=W, pady=12, padx=10)
+                vars_by_key[section, key] = var
+                fields.append((var, section, key, default))
+            notebook.add(frame, text=tab_text)
+        # 显式选中首页：标签页在下一次空闲时统一布局，无需 update() 强制刷新
+        notebook.select(0)
+        
+        def populate():
+            flat = self._flat_config
+            for var, section, key, default in fields:
+                value = flat.get(f"{section}.{key}", default)
+                var.set(str(value) if isinstance(var, StringVar) else value)
         
         # 按钮栏
         btn_frame = ttk.Frame(main_container)
         btn_frame.pack(fill=X, pady=(15, 0))
         
-        def validate_int(value: str, name: str, min_val: int, max_val: int) -> tuple:
-            """验证整数输入，返回 (是否有效, 值或错误信息)"""
-            try:
-                val = int(value.strip())
-                if val < min_val or val > max_val:
-                    return False, f"{name} 必须在 {min_val} 到 {max_val} 之间（当前值：{val}）"
-                return True, val
-            except ValueError:
-                return False, f"{name} 必须是有效的整数（当前输入：'{value}'）"
-        
-        def validate_float(value: str, name: str, min_val: float, max_val: float) -> tuple:
-            """验证浮点数输入，返回 (是否有效, 值或错误信息)"""
-            try:
-                val = float(value.strip())
-                if val < min_val or val > max_val:
-                    return False, f"{name} 必须在 {min_val} 到 {max_val} 之间（当前值：{val}）"
-                return True, val
-            except ValueError:
-                return False, f"{name} 必须是有效的数字（当前输入：'{value}'）"
-        
         def validate_all_inputs() -> tuple:
             """验证所有输入，返回 (是否全部有效, 错误信息列表, 配置字典)"""
             errors = []
-            config = {}
-            
-            # TCP 配置验证
-            config["tcp"] = {}
-            
-            ok, result = validate_int(port_var.get(), "TCP端口", 1, 65535)
-            if ok:
-                config["tcp"]["port"] = result
-            else:
-                errors.append(result)
-            
-            ok, result = validate_int(attempts_var.get(), "TCP尝试次数", 1, 50)
-            if ok:
-                config["tcp"]["attempts"] = result
-            else:
-                errors.append(result)
-            
-            ok, result = validate_float(timeout_var.get(), "TCP超时时间", 0.1, 60.0)
-            if ok:
-                config["tcp"]["timeout"] = result
-            else:
-                errors.append(result)
-            
-            ok, result = validate_float(interval_var.get(), "TCP间隔时间", 0.0, 10.0)
-            if ok:
-                config["tcp"]["interval"] = result
-            else:
-                errors.append(result)
-            
-            # TLS 配置验证
-            config["tls"] = {}
-            config["tls"]["enabled"] = tls_enabled_var.get()
-            config["tls"]["verify_hostname"] = verify_hostname_var.get()
-            config["tls"]["strict"] = strict_var.get()
-            
-            ok, result = validate_float(tls_timeout_var.get(), "TLS超时时间", 0.1, 60.0)
-            if ok:
-                config["tls"]["timeout"] = result
-            else:
-                errors.append(result)
-            
-            ok, result = validate_int(try_hosts_limit_var.get(), "尝试域名数量", 1, 20)
-            if ok:
-                config["tls"]["try_hosts_limit"] = result
-            else:
-                errors.append(result)
-            
-            # ICMP 配置验证
-            config["icmp"] = {}
-            config["icmp"]["enabled"] = icmp_enabled_var.get()
-            config["icmp"]["fallback_only"] = fallback_only_var.get()
-            
-            ok, result = validate_int(icmp_timeout_var.get(), "ICMP超时时间(毫秒)", 100, 60000)
-            if ok:
-                config["icmp"]["timeout_ms"] = result
-            else:
-                errors.append(result)
-            
-            # 重试配置验证
-            config["retry"] = {}
-            config["retry"]["enabled"] = retry_enabled_var.get()
-            
-            ok, result = validate_int(max_retries_var.get(), "最大重试次数", 0, 20)
-            if ok:
-                config["retry"]["max_retries"] = result
-            else:
-                errors.append(result)
-            
-            ok, result = validate_float(backoff_factor_var.get(), "退避因子", 0.1, 10.0)
-            if ok:
-                config["retry"]["backoff_factor"] = result
-            else:
-                errors.append(result)
-            
-            # 高级配置（布尔值无需验证）
-            config["advanced"] = {}
-            config["advanced"]["measure_jitter"] = measure_jitter_var.get()
-            config["advanced"]["calculate_stability"] = calculate_stability_var.get()
-            
+            config = {section: {} for _, section, _ in _SPEED_SETTINGS_TABS}
+            for section, key, kind, name, min_val, max_val in _SPEED_SETTINGS_NUMERIC:
+                try:
+                    config[section][key] = _validate_number(vars_by_key[section, key].get(), kind, name, min_val, max_val)
+                except ValueError as e:
+                    errors.append(str(e))
+            # 布尔值无需验证
+            for var, section, key, _ in fields:
+                if isinstance(var, BooleanVar):
+                    config[section][key] = var.get()
             return len(errors) == 0, errors, config
         
         def save_config():
@@ -1456,9 +1589,9 @@ class HostsOptimizer(ttk.Frame):
                 
                 if not is_valid:
                     # 显示所有错误
-                    error_msg = "配置验证失败，请修正以下问题：\n\n"
-                    for i, err in enumerate(errors, 1):
-                        error_msg += f"{i}. {err}\n"
+                    error_msg = "配置验证失败，请修正以下问题：\n\n" + "".join(
+                        f"{i}. {err}\n" for i, err in enumerate(errors, 1)
+                    )
                     messagebox.showerror("输入验证失败", error_msg)
                     self.logger.warning(f"配置验证失败: {errors}")
                     return
@@ -1494,7 +1627,7 @@ class HostsOptimizer(ttk.Frame):
                                     f"尝试次数={new_config['tcp']['attempts']}, "
                                     f"超时={new_config['tcp']['timeout']}秒")
                     messagebox.showinfo("成功", "配置已保存成功！\n新配置将在下次测速时生效。")
-                    settings_window.destroy()
+                    hide()
                 else:
                     messagebox.showerror("错误", "保存配置失败，请检查日志文件。")
             except Exception as e:
@@ -1508,23 +1641,28 @@ class HostsOptimizer(ttk.Frame):
                 self.speed_test_config = default_config
                 self.logger.info("配置已重置为默认值")
                 messagebox.showinfo("成功", "配置已重置为默认值！")
-                settings_window.destroy()
-                # 重新打开设置窗口以显示默认值
-                self.show_speed_test_settings()
+                # 原地回填默认值，无需重建窗口
+                populate()
         
         ttk.Button(btn_frame, text="重置为默认", command=reset_to_default, bootstyle="warning", width=15).pack(side=LEFT, padx=5)
-        ttk.Button(btn_frame, text="取消", command=settings_window.destroy, bootstyle="secondary", width=15).pack(side=RIGHT, padx=5)
+        ttk.Button(btn_frame, text="取消", command=hide, bootstyle="secondary", width=15).pack(side=RIGHT, padx=5)
         ttk.Button(btn_frame, text="保存", command=save_config, bootstyle="success", width=15).pack(side=RIGHT, padx=5)
         
-        # 绑定 ESC 键关闭窗口
-        settings_window.bind("<Escape>", lambda e: settings_window.destroy())
+        # 绑定 ESC 键 / 关闭按钮：隐藏窗口
+        settings_window.bind("<Escape>", lambda e: hide())
+        settings_window.protocol("WM_DELETE_WINDOW", hide)
         
-        # 延迟设置模态窗口，确保Notebook先显示
-        settings_window.after(100, set_modal)
+        def show():
+            populate()
+            settings_window.deiconify()
+            settings_window.lift()
+            # 延迟设置模态窗口，确保Notebook先显示
+            settings_window.after(100, set_modal)
         
-        # 最终更新确保所有内容显示
-        settings_window.update_idletasks()
-        settings_window.update()
+        self._speed_settings_window = settings_window
+        self._speed_settings_show = show
+        self.logger.info(f"测速设置窗口已创建，共 {len(notebook.tabs())} 个标签页")
+        show()
 
     def load_presets(self):
         """加载域名预设（保持原逻辑）。"""
@@ -1546,25 +1684,35 @@ class HostsOptimizer(ttk.Frame):
 
             # 首次落盘到用户目录，保证后续可持久化
             self.custom_presets = presets
-            self.save_presets()
+            self._flush_presets()
 
         # 去重（保持顺序）
-        seen = set()
-        uniq: List[str] = []
-        for d in presets:
-            if d not in seen:
-                seen.add(d)
-                uniq.append(d)
+        uniq = list(dict.fromkeys(presets))
         self.custom_presets = uniq if uniq else list(defaults)
+        self._preset_set = set(self.custom_presets)
 
         # 刷新 UI
-        self.preset_tree.delete(*self.preset_tree.get_children())
-        for idx, x in enumerate(self.custom_presets):
-            self._tv_insert(self.preset_tree, [x], idx)
+        self._tv_fill(self.preset_tree, ([x] for x in self.custom_presets))
 
     def save_presets(self):
+        """请求保存预设：PRESETS_SAVE_DEBOUNCE_MS 内的多次请求合并为一次写入。"""
+        if self._presets_save_after_id is None:
+            self._presets_save_after_id = self.master.after(PRESETS_SAVE_DEBOUNCE_MS, self._flush_presets)
+
+    def _flush_presets(self):
+        """立即写入预设（取消尚未执行的合并写入）；与上次写入内容相同则跳过。"""
+        if self._presets_save_after_id is not None:
+            try:
+                self.master.after_cancel(self._presets_save_after_id)
+            except Exception:
+                pass
+            self._presets_save_after_id = None
+        snapshot = tuple(self.custom_presets)
+        if snapshot == self._presets_saved:
+            return
         try:
             atomic_write_json(self.presets_file, self.custom_presets)
+            self._presets_saved = snapshot
         except Exception:
             pass
 
@@ -1572,10 +1720,11 @@ class HostsOptimizer(ttk.Frame):
         s = simpledialog.askstring("添加预设", "请输入域名（例如：example.com）:")
         if s:
             s = s.strip().lower()
-            if s not in self.custom_presets:
+            if s not in self._preset_set:
+                self._preset_set.add(s)
                 self.custom_presets.append(s)
-                idx = len(self.preset_tree.get_children())
-                self._tv_insert(self.preset_tree, [s], idx)
+                # 行号即预设数：不必取回整棵树的子项列表
+                self._tv_insert(self.preset_tree, [s], len(self.custom_presets) - 1)
                 self.save_presets()
 
     def delete_preset(self):
@@ -1584,11 +1733,11 @@ class HostsOptimizer(ttk.Frame):
             messagebox.showinfo("提示", "请先选择要删除的预设")
             return
         if messagebox.askyesno("确认", f"确定要删除选中的 {len(sel)} 个预设吗？"):
-            for i in sel:
-                v = self.preset_tree.item(i, "values")[0]
-                if v in self.custom_presets:
-                    self.custom_presets.remove(v)
-                self.preset_tree.delete(i)
+            # 一次过滤列表 + 一次 delete：避免逐个 list.remove（O(n) × 选中数）与逐行 Tcl 调用
+            removed = {self.preset_tree.item(i, "values")[0] for i in sel}
+            self.custom_presets = [d for d in self.custom_presets if d not in removed]
+            self._preset_set.difference_update(removed)
+            self.preset_tree.delete(*sel)
             self.save_presets()
 
     def on_preset_select(self, _):
@@ -1610,13 +1759,12 @@ class HostsOptimizer(ttk.Frame):
     def on_source_change(self):
         c = self.remote_source_var.get()
         self.remote_source_btn_text.set(self._format_remote_source_button_text(c))
-        mp = {l: u for l, u in REMOTE_HOSTS_SOURCE_CHOICES}
-        self.remote_source_url_override = mp.get(c)
+        self.remote_source_url_override = _REMOTE_SOURCE_URLS.get(c)
         if self.remote_source_url_override:
-            self.status_label.config(text=f"已选择远程源：{c}", bootstyle=INFO)
+            self._set_status(f"已选择远程源：{c}", INFO)
             self._toast("数据源切换", f"已切换到：{c}", bootstyle="info")
         else:
-            self.status_label.config(text="已选择远程源：自动（按优先级）", bootstyle=INFO)
+            self._set_status("已选择远程源：自动（按优先级）", INFO)
             self._toast("数据源切换", "已切换到：自动（按优先级）", bootstyle="info")
 
     def refresh_remote_hosts(self):
@@ -1629,56 +1777,50 @@ class HostsOptimizer(ttk.Frame):
         self.progress.start(10)
 
         choice = self.remote_source_var.get()
-        self.status_label.config(text=f"正在刷新远程Hosts…（源：{choice}）", bootstyle=INFO)
-        threading.Thread(target=self._fetch_remote_hosts, daemon=True).start()
-
-    def _fetch_remote_hosts(self):
-        import asyncio
-
-        async def fetch_async():
-            try:
-                if self.remote_source_url_override:
-                    self.logger.info(f"从指定源获取Hosts: {self.remote_source_url_override}")
-                    records, used_url = await self.remote_client.fetch_github_hosts_async(
-                        url_override=self.remote_source_url_override,
-                        concurrent=False
-                    )
-                else:
-                    self.logger.info("从自动源获取Hosts（按优先级）")
-                    records, used_url = await self.remote_client.fetch_github_hosts_async(concurrent=True)
-                self.remote_hosts_data = records
-                self.remote_hosts_source_url = used_url
-                self.logger.info(f"成功获取远程Hosts: {len(records)} 条记录，来源: {used_url}")
-                self.master.after(0, self._update_remote_hosts_ui)
-            except Exception as e:
-                self.logger.error(f"获取远程Hosts失败: {e}", exc_info=True)
-                self.master.after(0, self.progress.stop)
-                self.master.after(0, lambda: self.progress.configure(mode="determinate", value=0))
-                self.master.after(0, lambda: self.refresh_remote_btn.config(state=NORMAL))
-                self.master.after(0, lambda: messagebox.showerror("获取失败", f"无法获取远程Hosts:\n{e}"))
+        self._set_status(f"正在刷新远程Hosts…（源：{choice}）", INFO)
+        # 在常驻事件循环中获取：不必每次刷新都新建/销毁事件循环与线程
+        fut = asyncio.run_coroutine_threadsafe(
+            self._fetch_remote_hosts(self.remote_source_url_override), self._async_loop
+        )
+        fut.add_done_callback(self._fetch_remote_hosts_done)
+
+    async def _fetch_remote_hosts(self, url_override: Optional[str]) -> Tuple[List[Tuple[str, str]], str]:
+        """获取远程 Hosts：指定源则只取该源，否则按优先级并发尝试；返回 (记录, 来源 URL)"""
+        if url_override:
+            self.logger.info(f"从指定源获取Hosts: {url_override}")
+            return await self.remote_client.fetch_github_hosts_async(url_override=url_override, concurrent=False)
+        self.logger.info("从自动源获取Hosts（按优先级）")
+        return await self.remote_client.fetch_github_hosts_async(concurrent=True)
+
+    def _fetch_remote_hosts_done(self, fut: concurrent.futures.Future) -> None:
+        """远程 Hosts 获取结束（在事件循环线程回调）：结果交回主线程更新界面"""
+        if fut.cancelled():
+            return
+        e = fut.exception()
+        if e is not None:
+            self.logger.error(f"获取远程Hosts失败: {e}", exc_info=e)
+            self.master.after(0, self._fetch_remote_hosts_failed, e)
+            return
+        records, used_url = fut.result()
+        self.remote_hosts_data = records
+        self.remote_hosts_source_url = used_url
+        self.logger.info(f"成功获取远程Hosts: {len(records)} 条记录，来源: {used_url}")
+        self.master.after(0, self._update_remote_hosts_ui)
 
-        try:
-            asyncio.run(fetch_async())
-        except Exception as e:
-            self.logger.exception(f"异步获取远程Hosts时发生异常: {e}")
-            self.master.after(0, self.progress.stop)
-            self.master.after(0, lambda: self.progress.configure(mode="determinate", value=0))
-            self.master.after(0, lambda: self.refresh_remote_btn.config(state=NORMAL))
-            self.master.after(0, lambda: messagebox.showerror("获取失败", f"无法获取远程Hosts:\n{e}"))
+    def _fetch_remote_hosts_failed(self, e: BaseException) -> None:
+        self.progress.stop()
+        self.progress.configure(mode="determinate", value=0)
+        self.refresh_remote_btn.config(state=NORMAL)
+        messagebox.showerror("获取失败", f"无法获取远程Hosts:\n{e}")
 
     def _update_remote_hosts_ui(self):
         self.progress.stop()
         self.progress.configure(mode="determinate", value=0)
 
-        self.remote_tree.delete(*self.remote_tree.get_children())
-        for idx, x in enumerate(self.remote_hosts_data):
-            self._tv_insert(self.remote_tree, x, idx)
+        self._tv_fill(self.remote_tree, self.remote_hosts_data)
 
         src = self.remote_hosts_source_url or self.remote_source_var.get()
-        self.status_label.config(
-            text=f"远程Hosts刷新完成，共找到 {len(self.remote_hosts_data)} 条记录（来源：{src}）",
-            bootstyle=SUCCESS,
-        )
+        self._set_status(f"远程Hosts刷新完成，共找到 {len(self.remote_hosts_data)} 条记录（来源：{src}）", SUCCESS)
         self.refresh_remote_btn.config(state=NORMAL)
         self.check_start_btn()
 
@@ -1694,7 +1836,7 @@ class HostsOptimizer(ttk.Frame):
     # -----------------------------------------------------------------
     def resolve_selected_presets(self):
         self.resolve_preset_btn.config(state=DISABLED)
-        self.status_label.config(text="正在解析IP地址...", bootstyle=INFO)
+        self._set_status("正在解析IP地址...", INFO)
         threading.Thread(target=self._resolve_ips_thread, daemon=True).start()
 
     def _resolve_ips_thread(self):
@@ -1703,10 +1845,8 @@ class HostsOptimizer(ttk.Frame):
         self.master.after(0, self._update_resolve_ui)
 
     def _update_resolve_ui(self):
-        self.all_resolved_tree.delete(*self.all_resolved_tree.get_children())
-        for idx, x in enumerate(self.smart_resolved_ips):
-            self._tv_insert(self.all_resolved_tree, x, idx)
-        self.status_label.config(text=f"解析完成，共找到 {len(self.smart_resolved_ips)} 个IP", bootstyle=SUCCESS)
+        self._tv_fill(self.all_resolved_tree, self.smart_resolved_ips)
+        self._set_status(f"解析完成，共找到 {len(self.smart_resolved_ips)} 个IP", SUCCESS)
         self.resolve_preset_btn.config(state=NORMAL)
         self.check_start_btn()
 
@@ -1717,33 +1857,32 @@ class HostsOptimizer(ttk.Frame):
         """
         开始测速（修复版）
         关键点（保持原版行为）：
-        1) 进度条实时更新：按 as_completed() 逐个回调 UI。
+        1) 进度条实时更新：每个 IP 完成即由回调放入结果队列，主线程泵批量更新 UI。
         2) 结果完整：同一 IP 可能对应多个域名，使用 ip -> [domains] 映射展开多行。
         3) 进度统计：按“唯一 IP 数”统计；结果表展示每个 (IP, 域名) 组合。
         """
         # 清空旧结果
         self.result_tree.delete(*self.result_tree.get_children())
+        self._result_row_ids = []
+        self._result_row_render = []
+        self._result_offset = 0
         self.test_results = []
+        self._sorted_result_index = []
+        self._result_index = {}
 
-        raw_pairs = list(self.remote_hosts_data) + list(self.smart_resolved_ips)
-        if not raw_pairs:
+        if not (self.remote_hosts_data or self.smart_resolved_ips):
             messagebox.showinfo("提示", "没有可测试的IP地址，请先解析IP或刷新远程Hosts")
             return
 
-        # 去除“完全重复的 (ip, domain)”
-        seen_pair = set()
-        pairs: List[Tuple[str, str]] = []
-        for ip, dom in raw_pairs:
-            key = (str(ip).strip(), str(dom).strip())
-            if key in seen_pair:
-                continue
-            seen_pair.add(key)
-            pairs.append(key)
+        # ip -> {domain: None}：内层 dict 作为“有序集合”，O(1) 去除重复的 (ip, domain)，
+        # 同时保持首次出现顺序（SNI 候选与结果出现顺序稳定），无需中间 pairs 列表与事后排序
+        ip_domains: DefaultDict[str, Dict[str, None]] = defaultdict(dict)
+        for src in (self.remote_hosts_data, self.smart_resolved_ips):
+            for ip, dom in src:
+                ip_domains[str(ip).strip()][str(dom).strip()] = None
 
         # ip -> [domains]
-        self._ip_to_domains = {}
-        for ip, dom in pairs:
-            self._ip_to_domains.setdefault(ip, []).append(dom)
+        self._ip_to_domains = {ip: list(doms) for ip, doms in ip_domains.items()}
 
         ip_list = list(self._ip_to_domains.keys())
 
@@ -1756,40 +1895,42 @@ class HostsOptimizer(ttk.Frame):
         self.total_ip_tests = len(ip_list)
         self.completed_ip_tests = 0
         self.progress.configure(mode="determinate", value=0)
-        self.status_label.config(text=f"正在测速… 0/{self.total_ip_tests} (IP)", bootstyle=INFO)
+        self._set_status(f"正在测速… 0/{self.total_ip_tests} (IP)", INFO)
 
         use_advanced = bool(self.advanced_metrics_var.get())
 
         # TLS/SNI: 为同一 IP 生成候选域名列表（按优先级），避免只用第一个域名导致误判全失败
         # 使用自定义配置
-        tls_cfg = self.speed_test_config.get("tls", {}) if isinstance(self.speed_test_config, dict) else {}
-        preferred_hosts = tls_cfg.get("preferred_hosts", []) if isinstance(tls_cfg, dict) else []
-        try_hosts_limit = int(tls_cfg.get("try_hosts_limit", 3)) if isinstance(tls_cfg, dict) else 3
+        flat_cfg = self._flat_config
+        preferred_hosts = flat_cfg.get("tls.preferred_hosts", [])
+        try_hosts_limit = int(flat_cfg.get("tls.try_hosts_limit", 3))
+        # TCP 配置（两种测速模式共用）
+        port = flat_cfg.get("tcp.port", 443)
+        attempts = flat_cfg.get("tcp.attempts", 5)
+        timeout = flat_cfg.get("tcp.timeout", 2.0)
+
+        # 与 IP 无关的部分只算一次：首选域名统一转小写并去重（保持优先级顺序）
+        preferred_lower = list(dict.fromkeys(
+            pl for pl in (str(p).strip().lower() for p in preferred_hosts or []) if pl
+        ))
+        sni_limit = max(1, try_hosts_limit)
 
         def build_sni_candidates(domains: List[str]) -> List[str]:
-            cleaned: List[str] = []
-            seen_l: set = set()
-            for d in domains or []:
-                dd = str(d).strip()
-                if not dd:
-                    continue
-                dl = dd.lower()
-                if dl in seen_l:
-                    continue
-                seen_l.add(dl)
-                cleaned.append(dd)
-            if not cleaned:
+            # 小写 -> 首次出现的原始写法（域名在汇总时已 strip 并精确去重，这里再做大小写不敏感去重）
+            lower_to_orig: Dict[str, str] = {}
+            for d in domains:
+                if d:
+                    lower_to_orig.setdefault(d.lower(), d)
+            if not lower_to_orig:
                 return []
-            lower_to_orig = {c.lower(): c for c in cleaned}
-            out: List[str] = []
-            for p in preferred_hosts or []:
-                pl = str(p).strip().lower()
-                if pl in lower_to_orig and lower_to_orig[pl] not in out:
-                    out.append(lower_to_orig[pl])
-            for c in cleaned:
-                if c not in out:
-                    out.append(c)
-            return out[:max(1, try_hosts_limit)]
+            out = [lower_to_orig[pl] for pl in preferred_lower if pl in lower_to_orig]
+            if len(out) < sni_limit:
+                chosen = set(out)
+                out.extend(c for c in lower_to_orig.values() if c not in chosen)
+            return out[:sni_limit]
+
+        # 每个 IP 的 SNI 候选一次算好，两种测速模式直接按 IP 取用
+        ip_sni = {ip: build_sni_candidates(doms) for ip, doms in self._ip_to_domains.items()}
         if use_advanced:
             # 使用自定义配置创建 EnhancedSpeedTester
             tester = EnhancedSpeedTester(
@@ -1797,113 +1938,220 @@ class HostsOptimizer(ttk.Frame):
                 stop_event=self._stop_event,
                 stop_flag=lambda: self.stop_test,
             )
-            workers = min(60, max(1, self.total_ip_tests))
-            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
-            self._futures = []
-            
-            # 获取 TCP 配置
-            tcp_cfg = self.speed_test_config.get("tcp", {})
-            port = tcp_cfg.get("port", 443)
-            attempts = tcp_cfg.get("attempts", 5)
-            timeout = tcp_cfg.get("timeout", 2.0)
-            
-            for ip in ip_list:
-                doms = self._ip_to_domains.get(ip, [])
-                cands = build_sni_candidates(doms)
-                self._futures.append(self.executor.submit(
-                    tester.test_with_retry, 
-                    ip, 
-                    sni_hosts=cands,
-                    port=port,
-                    attempts=attempts,
-                    timeout=timeout
-                ))
+            # 全部 IP 作为协程交给常驻事件循环，信号量限流；每个 IP 一个占位 Future，完成回调把结果放入队列
+            self.executor = None
+            self._futures = [concurrent.futures.Future() for _ in ip_list]
+            jobs = [(ip, outer, ip_sni[ip]) for ip, outer in zip(ip_list, self._futures)]
+            self._speedtest_batch = asyncio.run_coroutine_threadsafe(
+                self._speedtest_batch_async(tester, jobs, port=port, attempts=attempts, timeout=timeout),
+                self._async_loop,
+            )
         else:
             # 获取 ICMP 配置
-            icmp_cfg = self.speed_test_config.get("icmp", {})
-            icmp_enabled = icmp_cfg.get("enabled", True) and bool(self.icmp_fallback_var.get())
+            icmp_enabled = flat_cfg.get("icmp.enabled", True) and bool(self.icmp_fallback_var.get())
             
             tester = SpeedTester(
                 icmp_fallback=icmp_enabled,
                 stop_event=self._stop_event,
                 stop_flag=lambda: self.stop_test,
             )
+            # 线程池只做 TLS/ICMP 收尾；TCP 阶段由单线程 selectors 多路复用完成
             workers = min(60, max(1, self.total_ip_tests))
             self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
-            self._futures = []
+            # 每个 IP 一个占位 Future（完成回调把结果放入队列）；由 TLS/ICMP 任务完成时转交结果
+            self._futures = [concurrent.futures.Future() for _ in ip_list]
+            ip_futures = dict(zip(ip_list, self._futures))
             
-            # 获取 TCP 配置
-            tcp_cfg = self.speed_test_config.get("tcp", {})
-            port = tcp_cfg.get("port", 443)
-            attempts = tcp_cfg.get("attempts", 5)
-            timeout = tcp_cfg.get("timeout", 2.0)
-            
-            for ip in ip_list:
-                doms = self._ip_to_domains.get(ip, [])
-                cands = build_sni_candidates(doms)
-                self._futures.append(self.executor.submit(
-                    tester.test_one_ip, 
-                    ip, 
-                    sni_hosts=cands,
-                    port=port,
-                    attempts=attempts,
-                    timeout=timeout
-                ))
+            submit = self.executor.submit
+
+            def on_tcp_done(ip: str, tcp_result) -> None:
+                try:
+                    inner = submit(
+                        tester.test_one_ip,
+                        ip,
+                        sni_hosts=ip_sni[ip],
+                        port=port,
+                        attempts=attempts,
+                        timeout=timeout,
+                        tcp_result=tcp_result,
+                    )
+                except RuntimeError:
+                    # 线程池已关闭（测速被停止）
+                    ip_futures[ip].cancel()
+                    return
+                inner.add_done_callback(lambda f, outer=ip_futures[ip]: self._chain_future(outer, f))
+
+            def on_probe_done(f: concurrent.futures.Future) -> None:
+                # 多路复用线程异常/被停止：未完成的占位 Future 全部取消，避免收集线程永久等待
+                if f.cancelled() or f.exception() is not None or self._stop_event.is_set():
+                    for outer in ip_futures.values():
+                        outer.cancel()
+
+            submit(
+                tester.tcp_median_rtt_ms_many,
+                ip_list,
+                port=port,
+                attempts=attempts,
+                timeout=timeout,
+                on_result=on_tcp_done,
+            ).add_done_callback(on_probe_done)
         
         self.logger.info(f"开始测速，使用配置: TCP端口={port}, 尝试次数={attempts}, 超时={timeout}秒")
 
-        threading.Thread(target=self._collect_speedtest_results, daemon=True).start()
+        # 每轮测速一个新队列：上一轮残留的收集线程/泵不会串到本轮
+        self._result_queue = queue.SimpleQueue()
+        self._watch_speedtest_futures(self._result_queue, use_advanced)
+        self.master.after(RESULT_PUMP_INTERVAL_MS, self._pump_results, self._result_queue)
+
+    @staticmethod
+    async def _speedtest_batch_async(
+        tester: EnhancedSpeedTester,
+        jobs: List[Tuple[str, concurrent.futures.Future, List[str]]],
+        *,
+        port: int,
+        attempts: int,
+        timeout: float,
+    ) -> None:
+        """在事件循环中并发测速（信号量限流），逐个把结果写入对应的占位 Future。"""
+        # 信号量在循环内创建（Python 3.8/3.9 的 asyncio 原语在构造时绑定事件循环）
+        sem = asyncio.Semaphore(SPEED_TEST_ASYNC_CONCURRENCY)
+
+        async def one(ip: str, outer: concurrent.futures.Future, sni_hosts: List[str]) -> None:
+            async with sem:
+                if outer.done():
+                    return  # 已被停止测速取消
+                try:
+                    result = await tester.test_with_retry_async(
+                        ip, sni_hosts=sni_hosts, port=port, attempts=attempts, timeout=timeout,
+                    )
+                except Exception as e:
+                    settle, value = outer.set_exception, e
+                else:
+                    settle, value = outer.set_result, result
+                try:
+                    settle(value)
+                except concurrent.futures.InvalidStateError:
+                    pass  # 占位 Future 已被停止测速取消
+
+        await asyncio.gather(*(one(ip, outer, sni) for ip, outer, sni in jobs))
 
-    def _collect_speedtest_results(self):
-        """后台收集测速结果：按完成顺序逐个更新 UI（保证进度条实时）。"""
+    @staticmethod
+    def _chain_future(outer: concurrent.futures.Future, inner: concurrent.futures.Future) -> None:
+        """把 inner 的结果/异常/取消状态转交给占位 Future outer。"""
+        if outer.done():
+            return
         try:
-            use_advanced = bool(self.advanced_metrics_var.get())
-            for fut in concurrent.futures.as_completed(self._futures):
-                if self._stop_event.is_set() or self.stop_test:
-                    break
+            if inner.cancelled():
+                outer.cancel()
+            elif inner.exception() is not None:
+                outer.set_exception(inner.exception())
+            else:
+                outer.set_result(inner.result())
+        except concurrent.futures.InvalidStateError:
+            pass
+
+    def _watch_speedtest_futures(self, result_queue: queue.SimpleQueue, use_advanced: bool) -> None:
+        """给每个 IP 的 Future 挂完成回调：结果按完成顺序直接放入队列，由主线程泵批量更新 UI。
+
+        回调在完成该 Future 的线程上运行（无需专门的收集线程）；全部完成/取消后放入 None 收尾。
+        use_advanced 由 start_test 在主线程读取后传入：回调不访问 Tk 变量。
+        """
+        futures = self._futures
+        executor = self.executor
+        test_metadata = self._test_metadata
+        ip_to_domains = self._ip_to_domains
+        put = result_queue.put
+        remaining = len(futures)
+        lock = threading.Lock()
+
+        def finish() -> None:
+            put(None)
+            if executor:
+                try:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                except TypeError:
+                    executor.shutdown(wait=False)
+                except Exception:
+                    pass
+
+        def on_done(fut: concurrent.futures.Future) -> None:
+            nonlocal remaining
+            if not (fut.cancelled() or self._stop_event.is_set() or self.stop_test):
                 try:
                     result = fut.result()
                     if use_advanced and len(result) == 4:
                         ip, ms, st, metadata = result
-                        self._test_metadata[ip] = metadata
+                        test_metadata[ip] = metadata
                     else:
                         ip, ms, st = result[:3]
                         metadata = {}
                 except Exception as e:
                     ip, ms, st = "?", 9999, f"失败:{str(e)[:12]}"
                     metadata = {}
-
-                domains = self._ip_to_domains.get(ip, [""])
-                self.master.after(0, lambda ip=ip, domains=domains, ms=ms, st=st, meta=metadata: self._on_one_ip_finished(ip, domains, ms, st, meta))
-
-            self.master.after(0, self._finish_speedtest_ui)
-        finally:
-            if self.executor:
-                try:
-                    self.executor.shutdown(wait=False, cancel_futures=True)
-                except TypeError:
-                    self.executor.shutdown(wait=False)
-                except Exception:
-                    pass
-
-    def _on_one_ip_finished(self, ip: str, domains: List[str], ms: int, status: str, metadata: Dict[str, Any] = None):
-        if self._stop_event.is_set() or self.stop_test:
+                put((ip, ip_to_domains.get(ip, [""]), ms, st, metadata))
+            with lock:
+                remaining -= 1
+                last = remaining == 0
+            if last:
+                finish()
+
+        if not futures:
+            finish()
             return
-        metadata = metadata or {}
-        jitter = metadata.get("jitter", 0.0) or 0.0
-        stability = metadata.get("stability_score", 0.0) or 0.0
-        rows = [(ip, dom, ms, status, jitter, stability) for dom in domains]
-        self._add_test_results_batch(rows, ip_completed_increment=1)
+        for fut in futures:
+            fut.add_done_callback(on_done)
+
+    def _pump_results(self, result_queue: queue.SimpleQueue):
+        """主线程结果泵：每周期最多取 RESULT_PUMP_MAX_BATCH 个结果，合并成一批写入结果与进度；收到 None 时收尾。"""
+        if result_queue is not self._result_queue:
+            return  # 已开始新一轮测速，旧泵退出
+
+        stopped = self._stop_event.is_set() or self.stop_test
+        rows = []
+        completed = 0
+        finished = False
+        for _ in range(RESULT_PUMP_MAX_BATCH):
+            try:
+                item = result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                finished = True
+                break
+            if stopped:
+                continue
+            ip, domains, ms, status, metadata = item
+            metadata = metadata or {}
+            jitter = metadata.get("jitter", 0.0) or 0.0
+            stability = metadata.get("stability_score", 0.0) or 0.0
+            rows.extend((ip, dom, ms, status, jitter, stability) for dom in domains)
+            completed += 1
+
+        if completed:
+            self._add_test_results_batch(rows, ip_completed_increment=completed)
+        if finished:
+            self._finish_speedtest_ui()
+            return
+        self.master.after(RESULT_PUMP_INTERVAL_MS, self._pump_results, result_queue)
 
     def _finish_speedtest_ui(self):
         if self._stop_event.is_set() or self.stop_test:
-            self.status_label.config(text=f"测速已停止（完成 {self.completed_ip_tests}/{self.total_ip_tests} 个IP）", bootstyle=WARNING)
+            self._set_status(f"测速已停止（完成 {self.completed_ip_tests}/{self.total_ip_tests} 个IP）", WARNING)
         else:
             self.progress.configure(value=100)
-            self.status_label.config(text=f"测速完成，共测试 {self.total_ip_tests} 个IP", bootstyle=SUCCESS)
+            self._set_status(f"测速完成，共测试 {self.total_ip_tests} 个IP", SUCCESS)
 
         self.start_test_btn.config(state=NORMAL)
         self.pause_test_btn.config(state=DISABLED)
+
+        # 最后一批结果立即排序显示（不等节流）
+        if self._sort_after_id:
+            try:
+                self.master.after_cancel(self._sort_after_id)
+            except Exception:
+                pass
+            self._sort_after_id = None
+        self._flush_sort_results()
         
         # 如果是定时测速，执行回调
         if self._is_scheduled_test_running:
@@ -1918,7 +2166,14 @@ class HostsOptimizer(ttk.Frame):
             else:
                 ip, domain, delay, status = row[:4]
                 jitter, stability = 0.0, 0.0
-            self.test_results.append((ip, domain, int(delay), str(status), False, float(jitter), float(stability)))
+            result = (ip, domain, int(delay), str(status), False, float(jitter), float(stability))
+            self.test_results.append(result)
+            self._result_index[(ip, domain)] = len(self.test_results) - 1
+            # 插入即有序：flush 时无需整表 sorted()；下标作为次键保持稳定顺序
+            bisect.insort(
+                self._sorted_result_index,
+                (self._rank_key_for_result_row(result), len(self.test_results) - 1),
+            )
 
         if ip_completed_increment:
             self.completed_ip_tests += int(ip_completed_increment)
@@ -1926,14 +2181,55 @@ class HostsOptimizer(ttk.Frame):
                 self.progress["value"] = (self.completed_ip_tests / self.total_ip_tests) * 100.0
             else:
                 self.progress["value"] = 0
-            self.status_label.config(
-                text=f"测速中… {self.completed_ip_tests}/{self.total_ip_tests} (IP)",
-                bootstyle=INFO,
-            )
+            self._set_status(f"测速中… {self.completed_ip_tests}/{self.total_ip_tests} (IP)", INFO, throttle=True)
 
-        # 节流排序，避免界面卡顿
-        if not self._sort_after_id:
-            self._sort_after_id = self.master.after(200, self._flush_sort_results)
+        self._schedule_sort_results()
+
+    def _set_status(self, text: str, bootstyle: str, *, throttle: bool = False) -> None:
+        """更新状态栏。throttle=True 时合并到 STATUS_THROTTLE_MS 内只应用最后一次；
+        非节流更新立即生效，并丢弃尚未应用的节流更新（避免旧进度覆盖最终状态）。"""
+        if throttle:
+            self._status_pending = (text, bootstyle)
+            if self._status_after_id is None:
+                self._status_after_id = self.master.after(STATUS_THROTTLE_MS, self._flush_status)
+            return
+        if self._status_after_id is not None:
+            self.master.after_cancel(self._status_after_id)
+            self._status_after_id = None
+        self._status_pending = None
+        self._apply_status(text, bootstyle)
+
+    def _flush_status(self) -> None:
+        self._status_after_id = None
+        pending, self._status_pending = self._status_pending, None
+        if pending:
+            self._apply_status(*pending)
+
+    def _apply_status(self, text: str, bootstyle: str) -> None:
+        # 样式未变时只改文本：bootstyle 会重新生成/应用 ttk 样式
+        if bootstyle == self._status_style:
+            self.status_label.config(text=text)
+        else:
+            self.status_label.config(text=text, bootstyle=bootstyle)
+            self._status_style = bootstyle
+
+    def _schedule_sort_results(self, delay_ms: Optional[int] = None):
+        """节流排序，避免界面卡顿：测速前期结果密集，拉长刷新间隔。"""
+        if self._sort_after_id:
+            return
+        if delay_ms is None:
+            delay_ms = RESULT_SORT_THROTTLE_MS
+            if self.total_ip_tests and self.completed_ip_tests < self.total_ip_tests * RESULT_SORT_SLOW_UNTIL_RATIO:
+                delay_ms = RESULT_SORT_THROTTLE_SLOW_MS
+        self._sort_after_id = self.master.after(delay_ms, self._flush_sort_results)
+
+    def _on_result_tree_map(self, _evt=None):
+        """结果表或顶层窗口重新可见（如从托盘恢复）时，补一次被跳过的排序刷新。
+
+        顶层窗口的 <Map> 绑定也会收到各子控件的 <Map>：这里只检查标志，开销可忽略。
+        """
+        if self._sort_pending:
+            self._schedule_sort_results(delay_ms=0)
 
     def _rank_key_for_result_row(self, row):
         """综合排序/选优键：越小越好。
@@ -1990,16 +2286,100 @@ class HostsOptimizer(ttk.Frame):
         self._sort_after_id = None
         if not self.result_tree.winfo_exists():
             return
-        self.result_tree.delete(*self.result_tree.get_children())
-        for idx, row in enumerate(sorted(self.test_results, key=self._rank_key_for_result_row)):
+        if not self.result_tree.winfo_viewable():
+            # 不可见时不做排序/重绘；下次结果到达或 <Map> 时再刷新
+            self._sort_pending = True
+            return
+        self._sort_pending = False
+        self._render_result_window()
+
+    def _render_result_window(self) -> None:
+        """把排序结果中当前可视的一段渲染到 Treeview（虚拟滚动）。
+
+        Treeview 中只保留一屏的行，按屏幕位置复用（item），内容未变的行不发 Tcl 调用；
+        斑马纹按屏幕位置着色，滚动时不必重设每一行的标签。
+        """
+        self._result_render_after_id = None
+        tv = self.result_tree
+        row_ids = self._result_row_ids
+        rendered = self._result_row_render
+        results = self.test_results
+        row_tags = self._row_tags
+        total = len(self._sorted_result_index)
+        offset = max(0, min(self._result_offset, total - self._result_window))
+        self._result_offset = offset
+        visible = self._sorted_result_index[offset:offset + self._result_window]
+        for idx, (_, ri) in enumerate(visible):
+            row = results[ri]
             if len(row) == 7:
                 ip, d, ms, st, sel, jitter, stability = row
                 jitter_str = f"{jitter:.1f}" if jitter > 0 else "-"
                 stability_str = f"{stability:.0f}" if stability > 0 else "-"
-                self._tv_insert(self.result_tree, ["✓" if sel else "□", ip, d, ms, jitter_str, stability_str, st], idx, status=st)
+                values = ("✓" if sel else "□", ip, d, ms, jitter_str, stability_str, st)
             else:
                 ip, d, ms, st, sel = row[:5]
-                self._tv_insert(self.result_tree, ["✓" if sel else "□", ip, d, ms, "-", "-", st], idx, status=st)
+                values = ("✓" if sel else "□", ip, d, ms, "-", "-", st)
+
+            tags = row_tags(idx, st)
+            if idx < len(row_ids):
+                # 大部分行在两次刷新之间位置与内容都没变：只给变化的行发 item 调用
+                if rendered[idx] != (values, tags):
+                    tv.item(row_ids[idx], values=values, tags=tags)
+                    rendered[idx] = (values, tags)
+            else:
+                row_ids.append(tv.insert("", "end", values=values, tags=tags))
+                rendered.append((values, tags))
+        # 可视区域变小（窗口缩小 / 结果变少）：删掉多余的行
+        n = len(visible)
+        if len(row_ids) > n:
+            tv.delete(*row_ids[n:])
+            del row_ids[n:]
+            del rendered[n:]
+        if total:
+            self.result_scroll.set(offset / total, (offset + n) / total)
+        else:
+            self.result_scroll.set(0.0, 1.0)
+
+    def _scroll_results_to(self, offset: int) -> None:
+        total = len(self._sorted_result_index)
+        offset = max(0, min(int(offset), total - self._result_window))
+        if offset != self._result_offset:
+            self._result_offset = offset
+            # 拖动滚动条 / 快速滚轮会连续触发：同一轮事件只在空闲时渲染一次（按最终偏移）
+            if self._result_render_after_id is None:
+                self._result_render_after_id = self.master.after_idle(self._render_result_window)
+
+    def _on_result_scroll(self, *args) -> None:
+        """滚动条命令：moveto 比例 / scroll n units|pages"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_results_to(round(float(args[1]) * len(self._sorted_result_index)))
+        elif args[0] == "scroll":
+            step = self._result_window if args[2] == "pages" else 1
+            self._scroll_results_to(self._result_offset + int(args[1]) * step)
+
+    def _on_result_wheel(self, event):
+        """鼠标滚轮：移动虚拟偏移，并阻止 Treeview 自身滚动（它只持有一屏的行）"""
+        if event.num == 4:
+            units = -1
+        elif event.num == 5:
+            units = 1
+        else:
+            units = -1 if event.delta > 0 else 1
+        self._scroll_results_to(self._result_offset + units * RESULT_WHEEL_ROWS)
+        return "break"
+
+    def _on_result_tree_configure(self, event) -> None:
+        """结果表尺寸变化：按可容纳的行数（扣除表头一行）调整可视窗口"""
+        window = max(1, event.height // TREEVIEW_ROW_HEIGHT_PX - 1)
+        if window != self._result_window:
+            self._result_window = window
+            if self.result_tree.winfo_viewable():
+                self._render_result_window()
+            else:
+                # 隐藏（托盘 / 其他标签页）期间的尺寸变化：重新可见时由 <Map> 补渲染
+                self._sort_pending = True
 
     def pause_test(self):
         """停止当前测速任务（尽量快速释放线程池与UI状态）。"""
@@ -2013,8 +2393,15 @@ class HostsOptimizer(ttk.Frame):
                 self.executor.shutdown(wait=False)
             except Exception:
                 pass
-
-        self.status_label.config(text="测速已请求停止…", bootstyle=WARNING)
+        # 高级测速批次在事件循环中运行：取消其任务即取消全部在途协程
+        if self._speedtest_batch is not None:
+            self._speedtest_batch.cancel()
+            self._speedtest_batch = None
+        # 占位 Future 不属于线程池，需单独取消，收集线程才能退出
+        for f in self._futures:
+            f.cancel()
+
+        self._set_status("测速已请求停止…", WARNING)
         try:
             self.progress.stop()
         except Exception:
@@ -2034,61 +2421,47 @@ class HostsOptimizer(ttk.Frame):
         if not item:
             return
         v = self.result_tree.item(item, "values")
-        t_ip, t_dom = v[1], v[2]
-        for i, row in enumerate(self.test_results):
-            if len(row) == 7:
-                ip, d, ms, st, s, jitter, stability = row
-                if ip == t_ip and d == t_dom:
-                    self.test_results[i] = (ip, d, ms, st, not s, jitter, stability)
-                    jitter_str = f"{jitter:.1f}" if jitter > 0 else "-"
-                    stability_str = f"{stability:.0f}" if stability > 0 else "-"
-                    self.result_tree.item(item, values=["✓" if not s else "□", ip, d, ms, jitter_str, stability_str, st])
-                    break
-            else:
-                ip, d, ms, st, s = row[:5]
-                if ip == t_ip and d == t_dom:
-                    self.test_results[i] = (ip, d, ms, st, not s, 0.0, 0.0)
-                    self.result_tree.item(item, values=["✓" if not s else "□", ip, d, ms, "-", "-", st])
-                    break
+        i = self._result_index.get((v[1], v[2]))
+        if i is None:
+            return
+        row = self.test_results[i]
+        if len(row) == 7:
+            ip, d, ms, st, s, jitter, stability = row
+            self.test_results[i] = (ip, d, ms, st, not s, jitter, stability)
+            jitter_str = f"{jitter:.1f}" if jitter > 0 else "-"
+            stability_str = f"{stability:.0f}" if stability > 0 else "-"
+            self.result_tree.item(item, values=["✓" if not s else "□", ip, d, ms, jitter_str, stability_str, st])
+        else:
+            ip, d, ms, st, s = row[:5]
+            self.test_results[i] = (ip, d, ms, st, not s, 0.0, 0.0)
+            self.result_tree.item(item, values=["✓" if not s else "□", ip, d, ms, "-", "-", st])
 
     # -----------------------------------------------------------------
     # Write / rollback hosts
     # -----------------------------------------------------------------
     def write_best_ip_to_hosts(self):
         # 优先写入 TLS/SNI 验证通过的结果；若某域名没有 TLS 通过项，再回退到普通“可用”项
-        best_tls: Dict[str, Tuple[str, int, tuple]] = {}
-        best_any: Dict[str, Tuple[str, int, tuple]] = {}
-
-        for row in self.test_results:
-            if len(row) == 7:
-                ip, d, ms, st, _, _, _ = row
-            else:
-                ip, d, ms, st, _ = row[:5]
-
-            st_s = str(st)
-            if not st_s.startswith("可用"):
+        # _sorted_result_index 已按综合排序键（入表时算好并缓存）升序排列：
+        # 每个域名第一次遇到的可用项即最优，无需逐行重算排序键再比较
+        best_tls: Dict[str, str] = {}
+        best_any: Dict[str, str] = {}
+        results = self.test_results
+        for _, i in self._sorted_result_index:
+            ip, d, _, st = results[i][:4]
+            if not st.startswith("可用"):
                 continue
-
-            # 记录任意可用
-            rk = self._rank_key_for_result_row((ip, d, ms, st, False, 0.0, 0.0) if len(row) < 7 else row)
-            if (d not in best_any) or (rk < best_any[d][2]):
-                best_any[d] = (ip, ms, rk)
-
+            best_any.setdefault(d, ip)
             # 记录 TLS 可用（更可信）
-            if "(TLS)" in st_s:
-                rk = self._rank_key_for_result_row((ip, d, ms, st, False, 0.0, 0.0) if len(row) < 7 else row)
-                if (d not in best_tls) or (rk < best_tls[d][2]):
-                    best_tls[d] = (ip, ms, rk)
+            if "(TLS)" in st:
+                best_tls.setdefault(d, ip)
 
         # 合并：TLS 优先
-        best: Dict[str, Tuple[str, int, tuple]] = {}
-        for d, v in best_any.items():
-            best[d] = best_tls.get(d, v)
+        best = {d: best_tls.get(d, ip) for d, ip in best_any.items()}
 
         if not best:
             messagebox.showinfo("提示", "没有可用的IP地址")
             return
-        self._do_write([(ip, d) for d, (ip, _, _) in best.items()])
+        self._do_write([(ip, d) for d, ip in best.items()])
 
     def write_selected_to_hosts(self):
         sel = []
@@ -2106,68 +2479,83 @@ class HostsOptimizer(ttk.Frame):
 
     def _do_write(self, records: List[Tuple[str, str]]):
         self.logger.info(f"开始写入Hosts文件，共 {len(records)} 条记录")
-        try:
-            # UI 提示：即便未管理员也先提示（写入时可能触发自动提权）
-            if not is_admin(probe_path=HOSTS_PATH):
-                self.logger.warning("当前没有管理员权限，将尝试自动提权")
-                self._toast("提示", "当前没有管理员权限，将尝试写入Hosts文件...", bootstyle="info", duration=2000)
+        # UI 提示：即便未管理员也先提示（写入时可能触发自动提权）
+        if not is_admin(probe_path=HOSTS_PATH):
+            self.logger.warning("当前没有管理员权限，将尝试自动提权")
+            self._toast("提示", "当前没有管理员权限，将尝试写入Hosts文件...", bootstyle="info", duration=2000)
 
-            # 1) 读取原 hosts + 备份
-            content, enc = self.hosts_mgr.read_hosts_text()
+        # 备份与写入在单线程 I/O 执行器中完成（多次点击按顺序执行），结果回到 Tk 主循环处理
+        fut = self._hosts_io_executor.submit(self._write_hosts_io, records)
+        fut.add_done_callback(lambda f: self.master.after(0, self._write_hosts_done, records, f))
+
+    def _write_hosts_io(self, records: List[Tuple[str, str]]):
+        """I/O 线程：备份 + 写入（不触碰 Tk 控件）。返回 (bak_path, upd, error)。"""
+        bak_path = None
+        try:
+            # 1) 备份原 hosts
             bak_path = self.hosts_mgr.create_backup()
             self.logger.info(f"已创建备份文件: {bak_path}")
+
+            # 2) 移除旧标记块（安全策略）并追加新块，多方案写入（权限不足时可自动提权）
+            #    mmap 读取、直接在字节上处理，读写共用同一个句柄
+            upd = self.hosts_mgr.apply_smart_block(
+                records,
+                allow_elevate=True,
+                on_need_elevation=lambda: self.master.after(
+                    0,
+                    lambda: self._toast("权限不足", "写入Hosts文件需要管理员权限，将自动尝试提权...", bootstyle="warning", duration=3000),
+                ),
+            )
+            self.logger.info(f"Hosts文件写入成功（{len(upd.data)} 字节）")
+            return bak_path, upd, None
+        except Exception as e:
+            return bak_path, None, e
+
+    def _write_hosts_done(self, records: List[Tuple[str, str]], fut: concurrent.futures.Future):
+        """Tk 主线程：根据写入结果更新 UI。"""
+        exc = fut.exception()
+        if exc is not None:
+            # 提权重启时 restart_as_admin 会 sys.exit：与原先在 Tk 回调中抛出保持一致
+            raise exc
+        bak_path, upd, err = fut.result()
+
+        if bak_path:
             try:
                 self.rollback_hosts_btn.config(state=NORMAL)
             except Exception as e:
                 self.logger.warning(f"更新回滚按钮状态失败: {e}")
 
-            # 2) 移除旧标记块（安全策略）
-            rm = self.hosts_mgr.remove_existing_smart_block(content)
-            if rm.marker_damaged:
-                self.logger.warning("检测到Hosts标记可能损坏（Start/End不成对），采用安全写入策略")
-                self._toast(
-                    "提示",
-                    "检测到 Hosts 标记可能损坏（Start/End 不成对）。已采用安全写入：不删除旧段，仅追加新段。必要时可点击\"回滚 Hosts\"。",
-                    bootstyle="warning",
-                    duration=4500,
-                )
-
-            # 3) 生成新块并追加到文件末尾
-            blk = self.hosts_mgr.build_block(records)
-            final_text = rm.content.rstrip() + blk
+        if err is not None:
+            if "permission denied" in str(err).lower() or "拒绝访问" in str(err):
+                self.logger.error(f"写入Hosts文件失败（权限不足）: {err}", exc_info=err)
+                self._toast("权限不足", "写入Hosts文件失败，请以管理员身份运行程序", bootstyle="warning", duration=3000)
+                messagebox.showerror("权限不足", f"写入Hosts文件失败: {err}\n请以管理员身份运行程序")
+            else:
+                self.logger.error(f"写入Hosts文件失败: {err}", exc_info=err)
+                messagebox.showerror("错误", f"写入Hosts文件失败: {err}")
+            return
 
-            # 4) 多方案写入（权限不足时可自动提权）
-            self.logger.info(f"开始写入Hosts文件（编码: {enc}）")
-            self.hosts_mgr.write_hosts_atomic(
-                final_text,
-                encoding=enc,
-                allow_elevate=True,
-                on_need_elevation=lambda: self._toast("权限不足", "写入Hosts文件需要管理员权限，将自动尝试提权...", bootstyle="warning", duration=3000),
+        if upd.marker_damaged:
+            self.logger.warning("检测到Hosts标记可能损坏（Start/End不成对），采用安全写入策略")
+            self._toast(
+                "提示",
+                "检测到 Hosts 标记可能损坏（Start/End 不成对）。已采用安全写入：不删除旧段，仅追加新段。必要时可点击\"回滚 Hosts\"。",
+                bootstyle="warning",
+                duration=4500,
             )
-            self.logger.info("Hosts文件写入成功")
 
-            # 5) 刷新 DNS
-            self.logger.info("刷新DNS缓存...")
-            self.hosts_mgr.flush_dns_cache()
-            self.logger.info("DNS缓存刷新成功")
+        # 3) 刷新 DNS（合并短时间内的多次请求）
+        self._schedule_dns_flush()
 
-            messagebox.showinfo(
-                "成功",
-                f"已成功将 {len(records)} 条记录写入 Hosts 文件\n\n"
-                f"写入前已自动备份：\n{bak_path}\n\n"
-                f"备份目录：{self.hosts_mgr.backup_dir}\n"
-                f"备份文件格式：hosts_YYYYMMDD_HHMMSS.bak\n\n"
-                "如需恢复，请点击底部\"回滚 Hosts\"。",
-            )
-            self.status_label.config(text="Hosts文件已更新（已备份）", bootstyle=SUCCESS)
-        except Exception as e:
-            if "permission denied" in str(e).lower() or "拒绝访问" in str(e):
-                self.logger.error(f"写入Hosts文件失败（权限不足）: {e}", exc_info=True)
-                self._toast("权限不足", "写入Hosts文件失败，请以管理员身份运行程序", bootstyle="warning", duration=3000)
-                messagebox.showerror("权限不足", f"写入Hosts文件失败: {e}\n请以管理员身份运行程序")
-            else:
-                self.logger.error(f"写入Hosts文件失败: {e}", exc_info=True)
-                messagebox.showerror("错误", f"写入Hosts文件失败: {e}")
+        messagebox.showinfo(
+            "成功",
+            f"已成功将 {len(records)} 条记录写入 Hosts 文件\n\n"
+            f"写入前已自动备份：\n{bak_path}\n\n"
+            f"备份目录：{self.hosts_mgr.backup_dir}\n"
+            f"备份文件格式：hosts_YYYYMMDD_HHMMSS.bak\n\n"
+            "如需恢复，请点击底部\"回滚 Hosts\"。",
+        )
+        self._set_status("Hosts文件已更新（已备份）", SUCCESS)
 
     def rollback_hosts(self):
         """回滚按钮：默认回滚到最近一次备份；也可选择备份文件回滚。"""
@@ -2195,12 +2583,12 @@ class HostsOptimizer(ttk.Frame):
         try:
             bak_text, used_enc = self.hosts_mgr.read_text_guess_encoding(bak_path)
             self.hosts_mgr.write_hosts_atomic(bak_text, encoding=used_enc, allow_elevate=False)
-            self.hosts_mgr.flush_dns_cache()
+            self._schedule_dns_flush()
             messagebox.showinfo(
                 "回滚成功",
                 f"已从备份恢复 hosts：\n{bak_path}\n\n备份目录：{self.hosts_mgr.backup_dir}",
             )
-            self.status_label.config(text="Hosts 已回滚并刷新DNS", bootstyle=SUCCESS)
+            self._set_status("Hosts 已回滚并刷新DNS", SUCCESS)
         except Exception as e:
             messagebox.showerror("回滚失败", f"回滚 Hosts 失败：{e}")
 
@@ -2208,29 +2596,54 @@ class HostsOptimizer(ttk.Frame):
     # OS helpers
     # -----------------------------------------------------------------
     def flush_dns(self, silent: bool = False):
-        """刷新DNS缓存（与原版行为一致：silent=True 时用 Toast）。"""
-        try:
-            self.hosts_mgr.flush_dns_cache()
-            if not silent:
-                messagebox.showinfo("成功", "DNS缓存已成功刷新")
-                self.status_label.config(text="DNS缓存已刷新", bootstyle=SUCCESS)
-            else:
-                self._toast("DNS刷新", "DNS缓存已成功刷新", bootstyle="success")
-        except Exception:
-            pass
+        """刷新DNS缓存（与原版行为一致：silent=True 时用 Toast）。
+
+        silent=True 时走合并刷新；两种方式都在 I/O 线程执行，不阻塞界面。
+        """
+        if silent:
+            self._schedule_dns_flush(notify=True)
+            return
+        fut = self._hosts_io_executor.submit(self.hosts_mgr.flush_dns_cache)
+        fut.add_done_callback(lambda f: self.master.after(0, self._flush_done, f, False, True))
+
+    def _schedule_dns_flush(self, *, notify: bool = False):
+        """请求刷新 DNS：DNS_FLUSH_DEBOUNCE_MS 内的多次请求合并为一次子进程调用。"""
+        self._flush_pending = True
+        self._flush_notify = self._flush_notify or notify
+        if self._flush_after_id is None:
+            self._flush_after_id = self.master.after(DNS_FLUSH_DEBOUNCE_MS, self._do_flush)
+
+    def _do_flush(self):
+        self._flush_after_id = None
+        if not self._flush_pending:
+            return
+        notify = self._flush_notify
+        self._flush_pending = False
+        self._flush_notify = False
+        self.logger.info("刷新DNS缓存...")
+        # 合并刷新不关心 ipconfig 的退出：fire-and-forget，不占住 I/O 线程
+        fut = self._hosts_io_executor.submit(self.hosts_mgr.flush_dns_cache, wait=False)
+        fut.add_done_callback(lambda f: self.master.after(0, self._flush_done, f, notify, False))
+
+    def _flush_done(self, fut: concurrent.futures.Future, toast: bool, dialog: bool):
+        """Tk 主线程：DNS 刷新完成后的日志与提示。"""
+        exc = fut.exception()
+        if isinstance(exc, (OSError, subprocess.SubprocessError)):
+            self.logger.error(f"刷新DNS缓存失败: {exc}")
+            return
+        if exc is not None:
+            raise exc  # 非预期错误：交给 Tk 的回调异常处理显示出来
+        self.logger.info("DNS缓存刷新成功")
+        if dialog:
+            messagebox.showinfo("成功", "DNS缓存已成功刷新")
+            self._set_status("DNS缓存已刷新", SUCCESS)
+        elif toast:
+            self._toast("DNS刷新", "DNS缓存已成功刷新", bootstyle="success")
 
     def view_hosts_file(self):
         try:
             self.hosts_mgr.open_hosts_file()
-        except Exception:
-            # 最保守的 fallback（仅Windows）
-            if sys.platform == "win32":
-                try:
-                    os.startfile(HOSTS_PATH)  # type: ignore[attr-defined]
-                except Exception:
-                    try:
-                        startupinfo = subprocess.STARTUPINFO()
-                        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                    except Exception:
-                        startupinfo = None
-                    subprocess.run(["notepad", HOSTS_PATH], startupinfo=startupinfo)
+        except OSError as e:
+            # startfile 与 notepad 都失败
+            self.logger.error(f"打开Hosts文件失败: {e}")
+            messagebox.showerror("错误", f"无法打开 Hosts 文件：{e}\n路径：{HOSTS_PATH}")
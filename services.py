@@ -14,18 +14,23 @@ services.py
 from __future__ import annotations
 
 import asyncio
+import collections
 import concurrent.futures
+import errno
+import heapq
 import ipaddress
 import json
 import os
 import re
+import selectors
 import socket
 import ssl
 import statistics
 import subprocess
 import sys
+import threading
 import time
-from typing import Callable, Iterable, List, Optional, Tuple, Dict, Any, Union, Set
+from typing import Callable, Iterable, List, Optional, Tuple, Dict, Any, Union
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -39,7 +44,7 @@ from config import (
     HTTP_CLIENT_CONFIG,
     DNS_RESOLVER_CONFIG,
 )
-from utils import get_logger
+from utils import CREATE_NO_WINDOW, HIDDEN_STARTUPINFO, get_logger
 
 
 # ---------------------------------------------------------------------
@@ -58,26 +63,38 @@ class RemoteHostsClient:
     ) -> None:
         self.urls = urls or list(REMOTE_HOSTS_URLS)
         self.timeout = timeout
-        self.session = session or self._build_http_session(app_name)
+        self.session = session or self._build_http_session(app_name, pool_size=len(self.urls))
+        # 条件请求缓存：url -> (etag, last_modified, body_text)
+        self._remote_cache: Dict[str, Tuple[Optional[str], Optional[str], str]] = {}
+        # 解析结果缓存：(url, ipv4_only, ipv6_only) -> (body_text, records)；正文未变（304）时跳过解析
+        self._parsed_cache: Dict[Tuple[str, bool, bool], Tuple[str, List[Tuple[str, str]]]] = {}
 
     @staticmethod
     def _build_retry() -> Retry:
         retry_config = HTTP_CLIENT_CONFIG.get("retry", {})
         kwargs = dict(
-            total=retry_config.get("total", 3),
-            connect=retry_config.get("connect", 3),
-            read=retry_config.get("read", 3),
-            backoff_factor=retry_config.get("backoff_factor", 0.5),
-            status_forcelist=tuple(retry_config.get("status_forcelist", [429, 500, 502, 503, 504])),
+            total=retry_config.get("total", 2),
+            connect=retry_config.get("connect", 2),
+            read=retry_config.get("read", 2),
+            backoff_factor=retry_config.get("backoff_factor", 0.3),
+            status_forcelist=tuple(retry_config.get("status_forcelist", [502, 503, 504])),
             raise_on_status=False,
         )
+        backoff_max = retry_config.get("backoff_max")
         try:
-            return Retry(allowed_methods=frozenset(["GET"]), **kwargs)
+            retry = Retry(allowed_methods=frozenset(["GET"]), **kwargs)
         except TypeError:
-            return Retry(method_whitelist=frozenset(["GET"]), **kwargs)
+            retry = Retry(method_whitelist=frozenset(["GET"]), **kwargs)
+        if backoff_max is not None:
+            # urllib3 2.x 支持构造参数 backoff_max；1.x 只能覆盖类属性 BACKOFF_MAX
+            try:
+                retry = retry.new(backoff_max=backoff_max)
+            except TypeError:
+                retry.BACKOFF_MAX = backoff_max
+        return retry
 
     @classmethod
-    def _build_http_session(cls, app_name: str) -> requests.Session:
+    def _build_http_session(cls, app_name: str, *, pool_size: Optional[int] = None) -> requests.Session:
         s = requests.Session()
         try:
             s.headers.update({"User-Agent": f"{app_name}/1.0"})
@@ -86,10 +103,11 @@ class RemoteHostsClient:
 
         retries = cls._build_retry()
         pool_config = HTTP_CLIENT_CONFIG.get("pool", {})
+        default_size = max(1, int(pool_size or len(REMOTE_HOSTS_URLS)))
         adapter = HTTPAdapter(
             max_retries=retries,
-            pool_connections=pool_config.get("connections", 20),
-            pool_maxsize=pool_config.get("maxsize", 20)
+            pool_connections=pool_config.get("connections") or default_size,
+            pool_maxsize=pool_config.get("maxsize") or default_size,
         )
         s.mount("http://", adapter)
         s.mount("https://", adapter)
@@ -115,8 +133,8 @@ class RemoteHostsClient:
         - 严格校验 IP 地址（支持 IPv4 和 IPv6），避免误解析 HTML/杂内容
         - 仅保留 host 中包含 "github" 的记录
         """
-        out: List[Tuple[str, str]] = []
-        seen: Set[Tuple[str, str]] = set()
+        # (ip, 小写域名) -> 首次出现的 (ip, 原始域名)：一个有序 dict 同时完成去重与保序
+        out: Dict[Tuple[str, str], Tuple[str, str]] = {}
 
         for raw in (txt or "").splitlines():
             line = (raw or "").strip()
@@ -161,13 +179,80 @@ class RemoteHostsClient:
                 if "github" not in host.lower():
                     continue
 
-                key = (ip_str, host.lower())
-                if key in seen:
-                    continue
-                seen.add(key)
-                out.append((ip_str, host))
+                out.setdefault((ip_str, host.lower()), (ip_str, host))
+
+        return list(out.values())
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """根据上次响应的 ETag / Last-Modified 生成条件请求头。"""
+        cached = self._remote_cache.get(url)
+        if not cached:
+            return {}
+        etag, last_modified, _ = cached
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def _remember_response(self, url: str, etag: Optional[str], last_modified: Optional[str], txt: str) -> None:
+        if etag or last_modified:
+            self._remote_cache[url] = (etag, last_modified, txt)
+        else:
+            self._remote_cache.pop(url, None)
+
+    def _cached_body(self, url: str) -> Optional[str]:
+        cached = self._remote_cache.get(url)
+        return cached[2] if cached else None
+
+    def _parse_cached(
+        self,
+        url: str,
+        txt: str,
+        *,
+        ipv4_only: bool = False,
+        ipv6_only: bool = False,
+    ) -> List[Tuple[str, str]]:
+        """解析 hosts 文本；同一 URL 的正文对象未变（304 复用）时直接返回上次的解析结果。"""
+        key = (url, bool(ipv4_only), bool(ipv6_only))
+        hit = self._parsed_cache.get(key)
+        if hit is not None and hit[0] is txt:
+            return list(hit[1])
+        parsed = self.parse_github_hosts_text(txt, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
+        self._parsed_cache[key] = (txt, parsed)
+        return list(parsed)
+
+    def _fetch_and_parse(
+        self,
+        url: str,
+        *,
+        ipv4_only: bool = False,
+        ipv6_only: bool = False,
+    ) -> List[Tuple[str, str]]:
+        """获取单个 URL 并解析；HTML/空内容返回 []，网络错误直接抛出。
 
-        return out
+        带 If-None-Match / If-Modified-Since：内容未变时服务器回 304，无正文、无需重新解析。
+        """
+        r = self.session.get(url, timeout=self.timeout, headers=self._conditional_headers(url))
+        if r.status_code == 304:
+            cached = self._cached_body(url)
+            if cached is not None:
+                return self._parse_cached(url, cached, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
+            # 本地缓存已丢失：去掉条件头重新拉取
+            r = self.session.get(url, timeout=self.timeout)
+        r.raise_for_status()
+
+        # 尽量避免把 HTML 当成 hosts：直接在原始字节上判断，被拒绝的响应不做字符集探测/解码
+        ctype = (r.headers.get("content-type") or "").lower()
+        if "text/html" in ctype:
+            head = r.content[:500].lower()
+            if b"<html" in head or b"<!doctype" in head:
+                return []
+
+        txt = r.text or ""
+        self._remember_response(url, r.headers.get("ETag"), r.headers.get("Last-Modified"), txt)
+        return self._parse_cached(url, txt, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
 
     def fetch_github_hosts(
         self,
@@ -178,6 +263,9 @@ class RemoteHostsClient:
     ) -> Tuple[List[Tuple[str, str]], str]:
         """获取并解析远程 hosts（同步版本）。
 
+        - 指定 url_override：只请求该源
+        - 自动模式：所有源并发请求，采用最先返回有效内容的源
+
         返回：(records, used_url)
         - records: [(ip, domain), ...]
         - used_url: 最终成功的 URL
@@ -185,27 +273,38 @@ class RemoteHostsClient:
         urls = [url_override] if url_override else list(self.urls)
         last_err: Optional[Exception] = None
 
-        for url in urls:
+        if len(urls) == 1:
+            url = urls[0]
             try:
-                r = self.session.get(url, timeout=self.timeout)
-                r.raise_for_status()
-                txt = r.text or ""
-
-                # 尽量避免把 HTML 当成 hosts
-                ctype = (r.headers.get("content-type") or "").lower()
-                head = txt[:500].lower()
-                if "text/html" in ctype and ("<html" in head or "<!doctype" in head):
-                    continue
-
-                parsed = self.parse_github_hosts_text(txt, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
+                parsed = self._fetch_and_parse(url, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
                 if parsed:
                     return parsed, url
-            except (requests.RequestException, socket.timeout, OSError) as e:
-                last_err = e
-                continue
             except Exception as e:
                 last_err = e
-                continue
+        elif urls:
+            ex = concurrent.futures.ThreadPoolExecutor(len(urls))
+            try:
+                fmap = {
+                    ex.submit(self._fetch_and_parse, url, ipv4_only=ipv4_only, ipv6_only=ipv6_only): url
+                    for url in urls
+                }
+                for f in concurrent.futures.as_completed(fmap):
+                    try:
+                        parsed = f.result()
+                    except (requests.RequestException, socket.timeout, OSError) as e:
+                        last_err = e
+                        continue
+                    except Exception as e:
+                        last_err = e
+                        continue
+                    if parsed:
+                        return parsed, fmap[f]
+            finally:
+                # 已有胜出者（或全部失败）：不等待其余请求
+                try:
+                    ex.shutdown(wait=False, cancel_futures=True)
+                except TypeError:
+                    ex.shutdown(wait=False)
 
         raise RuntimeError(f"所有远程 hosts 源均获取失败：{last_err}" if last_err else "所有远程 hosts 源均获取失败")
 
@@ -242,7 +341,8 @@ class RemoteHostsClient:
     ) -> Tuple[List[Tuple[str, str]], str]:
         """异步获取单个 URL 的 hosts 内容。"""
         try:
-            parsed = self.parse_github_hosts_text(
+            parsed = self._parse_cached(
+                url,
                 await self._fetch_url_content_async(url),
                 ipv4_only=ipv4_only,
                 ipv6_only=ipv6_only
@@ -264,7 +364,8 @@ class RemoteHostsClient:
 
         for url in urls:
             try:
-                parsed = self.parse_github_hosts_text(
+                parsed = self._parse_cached(
+                    url,
                     await self._fetch_url_content_async(url),
                     ipv4_only=ipv4_only,
                     ipv6_only=ipv6_only
@@ -299,35 +400,37 @@ class RemoteHostsClient:
             tasks.append(task)
             task_map[task] = url
 
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        pending = set(tasks)
+        last_err: Optional[Exception] = None
         try:
-            done, pending = await asyncio.wait(
-                tasks,
-                return_when=asyncio.FIRST_COMPLETED,
-                timeout=timeout
-            )
-
-            for task in done:
-                url = task_map[task]
-                try:
-                    content = task.result()
-                    parsed = self.parse_github_hosts_text(content, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
+            # 逐个收割先完成的任务：先完成但内容无效的源不应让整体失败
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise RuntimeError(f"获取 hosts 超时（{timeout}秒）")
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                    timeout=remaining,
+                )
+                for task in done:
+                    url = task_map[task]
+                    try:
+                        content = task.result()
+                        parsed = self._parse_cached(url, content, ipv4_only=ipv4_only, ipv6_only=ipv6_only)
+                    except Exception as e:
+                        last_err = e
+                        continue
                     if parsed:
-                        for p in pending:
-                            p.cancel()
                         return parsed, url
-                except Exception:
-                    continue
 
+            raise RuntimeError(f"所有远程 hosts 源均获取失败：{last_err}" if last_err else "所有远程 hosts 源均获取失败")
+        finally:
             for p in pending:
                 p.cancel()
 
-            raise RuntimeError("所有远程 hosts 源均获取失败")
-
-        except asyncio.TimeoutError:
-            for task in tasks:
-                task.cancel()
-            raise RuntimeError(f"获取 hosts 超时（{timeout}秒）")
-
     async def _fetch_url_content_async(self, url: str, max_retries: int = 3) -> str:
         """异步获取单个 URL 的内容，支持重试机制。"""
         import urllib.parse
@@ -346,7 +449,11 @@ class RemoteHostsClient:
                     timeout=self.timeout[1] if isinstance(self.timeout, tuple) else 10.0
                 )
 
-                request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {APP_NAME}/1.0\r\nConnection: close\r\n\r\n"
+                extra_headers = "".join(f"{k}: {v}\r\n" for k, v in self._conditional_headers(url).items())
+                request = (
+                    f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {APP_NAME}/1.0\r\n"
+                    f"{extra_headers}Connection: close\r\n\r\n"
+                )
                 writer.write(request.encode())
                 await writer.drain()
 
@@ -359,12 +466,28 @@ class RemoteHostsClient:
                 headers_end = False
                 content = []
                 is_html = False
+                etag: Optional[str] = None
+                last_modified: Optional[str] = None
+
+                status_parts = lines[0].split(None, 2) if lines else []
+                if len(status_parts) >= 2 and status_parts[1] == "304":
+                    cached = self._cached_body(url)
+                    if cached is not None:
+                        return cached
+                    # 本地缓存已丢失：清掉验证器后重试一次完整请求
+                    self._remote_cache.pop(url, None)
+                    raise RuntimeError(f"URL {url} 返回 304 但本地无缓存")
 
                 for line in lines:
                     if not headers_end:
-                        if line.lower().startswith('content-type:'):
-                            if 'text/html' in line.lower():
+                        lower = line.lower()
+                        if lower.startswith('content-type:'):
+                            if 'text/html' in lower:
                                 is_html = True
+                        elif lower.startswith('etag:'):
+                            etag = line.split(':', 1)[1].strip()
+                        elif lower.startswith('last-modified:'):
+                            last_modified = line.split(':', 1)[1].strip()
                         if line == '':
                             headers_end = True
                     else:
@@ -375,6 +498,7 @@ class RemoteHostsClient:
                 if is_html and ('<html' in txt[:500].lower() or '<!doctype' in txt[:500].lower()):
                     raise RuntimeError(f"URL {url} 返回的是 HTML 内容而非 hosts 文件")
 
+                self._remember_response(url, etag, last_modified, txt)
                 return txt
 
             except (asyncio.TimeoutError, socket.timeout, OSError, ssl.SSLError) as e:
@@ -395,10 +519,44 @@ class RemoteHostsClient:
 class DomainResolver:
     """并发 DNS 解析：输入域名列表，输出 (ip, domain) 列表。"""
 
-    def __init__(self, *, max_workers: Optional[int] = None) -> None:
+    def __init__(self, *, max_workers: Optional[int] = None, timeout: Optional[float] = None) -> None:
         if max_workers is None:
             max_workers = DNS_RESOLVER_CONFIG.get("max_workers", 20)
+        if timeout is None:
+            timeout = DNS_RESOLVER_CONFIG.get("timeout", 3.0)
         self.max_workers = max(1, int(max_workers))
+        self.timeout = max(0.1, float(timeout))
+        # 进行中的查询：(domain, ipv4_only, ipv6_only) -> Future；
+        # 定时测速与手动解析重叠时，同一域名复用已在进行的查询，不重复打到系统解析器
+        self._inflight: Dict[Tuple[str, bool, bool], concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _submit_coalesced(
+        self,
+        ex: concurrent.futures.ThreadPoolExecutor,
+        domain: str,
+        ipv4_only: bool,
+        ipv6_only: bool,
+    ) -> Tuple[concurrent.futures.Future, bool]:
+        """提交单个域名的解析；同一查询已在进行时直接复用其 Future。
+
+        返回 (Future, 是否由本次提交)：复用的 Future 属于其他调用的线程池，本调用不得取消它。
+        """
+        key = (domain, ipv4_only, ipv6_only)
+        with self._inflight_lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut, False
+            fut = ex.submit(self._resolve_single_domain, domain, ipv4_only, ipv6_only)
+            self._inflight[key] = fut
+
+        def _done(f: concurrent.futures.Future) -> None:
+            with self._inflight_lock:
+                if self._inflight.get(key) is f:
+                    del self._inflight[key]
+
+        fut.add_done_callback(_done)
+        return fut, True
 
     def resolve(
         self,
@@ -413,25 +571,79 @@ class DomainResolver:
             return []
 
         res: List[Tuple[str, str]] = []
-        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as ex:
-            fmap = {ex.submit(self._resolve_single_domain, d, ipv4_only, ipv6_only): d for d in ds}
-            for f in concurrent.futures.as_completed(fmap):
-                dom = fmap.get(f, "")
+        # 线程数不超过本批域名数：少量域名时不创建多余线程
+        ex = concurrent.futures.ThreadPoolExecutor(min(self.max_workers, len(ds)))
+        owned: Dict[Tuple[str, bool, bool], concurrent.futures.Future] = {}
+        # 用完成回调唤醒等待：Future.cancel()（含 shutdown(cancel_futures=True)）只触发回调，
+        # 不会唤醒 concurrent.futures.wait()，复用的查询被取消时需要立刻知道
+        changed = threading.Event()
+
+        def submit(d: str) -> concurrent.futures.Future:
+            f, is_own = self._submit_coalesced(ex, d, ipv4_only, ipv6_only)
+            if is_own:
+                owned[(d, ipv4_only, ipv6_only)] = f
+            f.add_done_callback(lambda _f: changed.set())
+            return f
+
+        try:
+            fmap = {d: submit(d) for d in ds}
+            # 总耗时封顶：个别 DNS 服务器响应极慢时，不让整批解析被拖住
+            deadline = time.monotonic() + self.timeout
+            while True:
+                changed.clear()
+                # 复用的查询可能被其发起方超时取消：在本批剩余时间内改由本批重新提交
+                remaining = deadline - time.monotonic()
+                retry = [d for d, f in fmap.items() if f.cancelled()] if remaining > 0 else []
+                if retry:
+                    for d in retry:
+                        fmap[d] = submit(d)
+                    continue
+                if remaining <= 0 or all(f.done() for f in fmap.values()):
+                    break
+                changed.wait(remaining)
+            for dom, f in fmap.items():
+                if not f.done() or f.cancelled():
+                    continue
                 try:
-                    ips = f.result()
-                    for ip in ips:
+                    for ip in f.result():
                         res.append((ip, dom))
                 except Exception:
                     pass
+        finally:
+            # 取消前先把本批提交且未完成的查询从 _inflight 摘除：之后的调用不会再复用到将被取消的 Future；
+            # 此前已复用它的调用会看到 cancelled() 并自行重新提交（线程池里只有本批自己提交的查询）
+            with self._inflight_lock:
+                for key, f in owned.items():
+                    if not f.done() and self._inflight.get(key) is f:
+                        del self._inflight[key]
+            try:
+                ex.shutdown(wait=False, cancel_futures=True)
+            except TypeError:
+                ex.shutdown(wait=False)
         return res
 
+    @staticmethod
+    def _addr_family(ipv4_only: bool, ipv6_only: bool) -> int:
+        """根据过滤条件选择 getaddrinfo 的地址族（只查需要的记录类型）。"""
+        if ipv4_only:
+            return socket.AF_INET
+        if ipv6_only:
+            return socket.AF_INET6
+        return socket.AF_UNSPEC
+
     @staticmethod
     def _resolve_single_domain(domain: str, ipv4_only: bool, ipv6_only: bool) -> List[str]:
         """解析单个域名，返回 IP 列表。"""
         ips = []
         try:
             # getaddrinfo 返回 [(family, type, proto, canonname, sockaddr), ...]
-            results = socket.getaddrinfo(domain, None)
+            # 固定 SOCK_STREAM：否则同一 IP 会按 TCP/UDP/RAW 各返回一次
+            results = socket.getaddrinfo(
+                domain,
+                None,
+                DomainResolver._addr_family(ipv4_only, ipv6_only),
+                socket.SOCK_STREAM,
+            )
 
             for result in results:
                 sockaddr = result[4]
@@ -492,7 +704,12 @@ class DomainResolver:
             # 使用 run_in_executor 将同步的 getaddrinfo 放到线程池执行
             results = await loop.run_in_executor(
                 None,
-                lambda: socket.getaddrinfo(domain, None)
+                lambda: socket.getaddrinfo(
+                    domain,
+                    None,
+                    DomainResolver._addr_family(ipv4_only, ipv6_only),
+                    socket.SOCK_STREAM,
+                ),
             )
 
             ips = []
@@ -570,31 +787,21 @@ class SpeedTester:
 
         成功返回 (rtt_ms, None)，失败返回 (None, err_str)。
         """
-        family = SpeedTester._get_ip_family(ip)
-        s = socket.socket(family, socket.SOCK_STREAM)
+        t0 = time.perf_counter()
         try:
-            s.settimeout(timeout)
-            t0 = time.perf_counter_ns()
-            addr = (ip, port, 0, 0) if family == socket.AF_INET6 else (ip, port)
-            err = s.connect_ex(addr)
-            t1 = time.perf_counter_ns()
-            if err != 0:
-                return None, f"connect_ex_err:{err}"
-            so_err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
-            if so_err != 0:
-                return None, f"so_error:{so_err}"
-            return (t1 - t0) / 1_000_000.0, None
+            with socket.create_connection((ip, port), timeout=timeout):
+                t1 = time.perf_counter()
+            return (t1 - t0) * 1000.0, None
         except socket.timeout:
             return None, "timeout"
+        except OSError as e:
+            if e.errno in (errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", -1)):
+                return None, "refused"
+            if e.errno in (errno.ETIMEDOUT, getattr(errno, "WSAETIMEDOUT", -1)):
+                return None, "timeout"
+            return None, f"connect_err:{e.errno}"
         except Exception as e:
             return None, f"err:{e}"
-        finally:
-            try:
-                s.close()
-            except Exception:
-                pass
-
-
 
     def _normalize_sni_host(self, host: Optional[str]) -> str:
         """规范化 SNI 主机名（提取纯域名）。
@@ -750,18 +957,28 @@ class SpeedTester:
         成功返回 (rtt_ms, None)，失败返回 (None, err_str)。
         """
         family = self._get_ip_family(ip)
+        t0 = time.perf_counter()
         try:
             _, writer = await asyncio.wait_for(
                 asyncio.open_connection(ip, port, family=family),
                 timeout=timeout
             )
-            # 连接成功，这里无法直接获取精确的 RTT
-            # 但我们可以近似测量
+            # 与同步版一致：以 connect 完成（三次握手）的耗时作为 RTT
+            rtt = (time.perf_counter() - t0) * 1000.0
             writer.close()
-            await writer.wait_closed()
-            return 0.0, None  # 实际 RTT 需要通过其他方式获取
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            return rtt, None
         except asyncio.TimeoutError:
             return None, "timeout"
+        except OSError as e:
+            if e.errno in (errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", -1)):
+                return None, "refused"
+            if e.errno in (errno.ETIMEDOUT, getattr(errno, "WSAETIMEDOUT", -1)):
+                return None, "timeout"
+            return None, f"connect_err:{e.errno}"
         except Exception as e:
             return None, f"err:{e}"
 
@@ -789,6 +1006,114 @@ class SpeedTester:
             return statistics.median(lat), True, None
         return None, False, last_err
 
+    def tcp_median_rtt_ms_many(
+        self,
+        ips: Iterable[str],
+        *,
+        port: int = 443,
+        attempts: int = 5,
+        timeout: float = 2.0,
+        max_inflight: int = 256,
+        on_result: Optional[Callable[[str, Tuple[Optional[float], bool, Optional[str]]], None]] = None,
+    ) -> Dict[str, Tuple[Optional[float], bool, Optional[str]]]:
+        """单线程批量 TCP 测速：非阻塞 socket + selectors 多路复用，语义同 tcp_median_rtt_ms。
+
+        - 每个 IP 的 attempts 次连接依次进行（与逐个测速一致），不同 IP 之间并发
+        - 同时在途的连接数不超过 max_inflight（Windows select 上限为 512）
+        - 某个 IP 全部尝试结束后立即回调 on_result(ip, (median_ms, ok, last_err))
+
+        返回 {ip: (median_ms, ok, last_err)}；被中途停止的 IP 不在结果中。
+        """
+        n_attempts = max(1, int(attempts))
+        in_progress = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}  # 10035: WSAEWOULDBLOCK
+
+        todo = collections.deque(dict.fromkeys(str(ip) for ip in ips))
+        left = {ip: n_attempts for ip in todo}
+        lat: Dict[str, List[float]] = {ip: [] for ip in todo}
+        last_err: Dict[str, Optional[str]] = {ip: None for ip in todo}
+        results: Dict[str, Tuple[Optional[float], bool, Optional[str]]] = {}
+
+        sel = selectors.DefaultSelector()
+        deadlines: List[Tuple[float, int, socket.socket]] = []
+        seq = 0
+
+        def finish_attempt(ip: str, rtt: Optional[float], err: Optional[str]) -> None:
+            last_err[ip] = err
+            if rtt is not None:
+                lat[ip].append(rtt)
+            if left[ip] > 0:
+                todo.append(ip)
+                return
+            res = (statistics.median(lat[ip]), True, None) if lat[ip] else (None, False, last_err[ip])
+            results[ip] = res
+            if on_result is not None:
+                on_result(ip, res)
+
+        def launch(ip: str) -> None:
+            nonlocal seq
+            left[ip] -= 1
+            family = self._get_ip_family(ip)
+            addr = (ip, port, 0, 0) if family == socket.AF_INET6 else (ip, port)
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+            except OSError as e:
+                finish_attempt(ip, None, f"connect_err:{e.errno}")
+                return
+            sock.setblocking(False)
+            t0 = time.perf_counter()
+            err = sock.connect_ex(addr)
+            if err not in in_progress:
+                sock.close()
+                finish_attempt(ip, None, "refused" if err == errno.ECONNREFUSED else f"connect_err:{err}")
+                return
+            sel.register(sock, selectors.EVENT_WRITE, (ip, t0))
+            seq += 1
+            heapq.heappush(deadlines, (t0 + timeout, seq, sock))
+
+        try:
+            while todo or sel.get_map():
+                if self._should_stop():
+                    break
+                while todo and len(sel.get_map()) < max_inflight:
+                    launch(todo.popleft())
+                if not sel.get_map():
+                    continue
+
+                # 最长等 0.1s，以便及时响应停止请求
+                wait = min(0.1, max(0.0, deadlines[0][0] - time.perf_counter())) if deadlines else 0.1
+                for key, _ in sel.select(wait):
+                    sock = key.fileobj
+                    ip, t0 = key.data
+                    t1 = time.perf_counter()
+                    so_err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    sel.unregister(sock)
+                    sock.close()
+                    if so_err == 0:
+                        finish_attempt(ip, (t1 - t0) * 1000.0, None)
+                    elif so_err in (errno.ECONNREFUSED, 10061):  # 10061: WSAECONNREFUSED
+                        finish_attempt(ip, None, "refused")
+                    else:
+                        finish_attempt(ip, None, f"so_error:{so_err}")
+
+                now = time.perf_counter()
+                while deadlines and deadlines[0][0] <= now:
+                    _, _, sock = heapq.heappop(deadlines)
+                    if sock.fileno() == -1:
+                        continue  # 已完成并关闭
+                    ip, _ = sel.get_key(sock).data
+                    sel.unregister(sock)
+                    sock.close()
+                    finish_attempt(ip, None, "timeout")
+        finally:
+            for key in list(sel.get_map().values()):
+                try:
+                    key.fileobj.close()
+                except Exception:
+                    pass
+            sel.close()
+
+        return results
+
     async def tcp_median_rtt_ms_async(
         self,
         ip: str,
@@ -824,12 +1149,6 @@ class SpeedTester:
         if sys.platform != "win32":
             return None
 
-        try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        except Exception:
-            startupinfo = None
-
         try:
             p = subprocess.run(
                 ["ping", "-n", "1", "-w", str(int(timeout_ms)), ip],
@@ -837,7 +1156,8 @@ class SpeedTester:
                 text=True,
                 encoding="utf-8",
                 errors="ignore",
-                startupinfo=startupinfo,
+                startupinfo=HIDDEN_STARTUPINFO,
+                creationflags=CREATE_NO_WINDOW,
             )
             out = (p.stdout or "") + "\n" + (p.stderr or "")
             m = re.search(r"(?:time|时间)[=<]\s*(\d+)\s*ms", out, re.IGNORECASE)
@@ -873,6 +1193,41 @@ class SpeedTester:
                 success_count += 1
             time.sleep(0.02)
 
+        return self._latency_metrics(latencies, success_count, attempts, last_err)
+
+    async def tcp_advanced_metrics_async(
+        self,
+        ip: str,
+        *,
+        port: int = 443,
+        attempts: int = 5,
+        timeout: float = 2.0,
+    ) -> Dict[str, Any]:
+        """异步版 tcp_advanced_metrics（指标含义一致），在事件循环内完成，不占用线程池。"""
+        latencies = []
+        success_count = 0
+        last_err: Optional[str] = None
+
+        for _ in range(attempts):
+            if self._should_stop():
+                break
+            rtt, err = await self._tcp_connect_rtt_ms_async(ip, port=port, timeout=timeout)
+            last_err = err
+            if rtt is not None:
+                latencies.append(rtt)
+                success_count += 1
+            await asyncio.sleep(0.02)
+
+        return self._latency_metrics(latencies, success_count, attempts, last_err)
+
+    def _latency_metrics(
+        self,
+        latencies: List[float],
+        success_count: int,
+        attempts: int,
+        last_err: Optional[str],
+    ) -> Dict[str, Any]:
+        """由多次 TCP 采样汇总延迟/抖动/丢包/稳定性指标（同步与异步版共用）。"""
         if not latencies:
             return {
                 "median": None,
@@ -929,11 +1284,14 @@ class SpeedTester:
         sni_host: Optional[str] = None,
         sni_hosts: Optional[Iterable[str]] = None,
         tls_verify: Optional[bool] = None,
+        tcp_result: Optional[Tuple[Optional[float], bool, Optional[str]]] = None,
     ) -> Tuple[str, int, str]:
         """对单个 IP 测速并返回 (ip, ms, status)，支持 IPv4/IPv6。
 
         新增：TLS/SNI 验证（可选，默认跟随配置开启）
         - 仅在 TCP 可用后做一次 TLS 握手验证（SNI=域名），避免“TCP 可连但并不是目标域名服务”的假可用 IP。
+
+        tcp_result：已由 tcp_median_rtt_ms_many 批量测得的 (median_ms, ok, err)，传入则跳过 TCP 测速。
         """
         if self._should_stop():
             return ip, 9999, "已停止"
@@ -948,7 +1306,10 @@ class SpeedTester:
         tls_strict = bool(tls_cfg.get("strict", False)) if isinstance(tls_cfg, dict) else False
         try_hosts_limit = int(tls_cfg.get("try_hosts_limit", 3)) if isinstance(tls_cfg, dict) else 3
 
-        med, ok, err = self.tcp_median_rtt_ms(ip, port=port, attempts=attempts, timeout=timeout)
+        if tcp_result is not None:
+            med, ok, err = tcp_result
+        else:
+            med, ok, err = self.tcp_median_rtt_ms(ip, port=port, attempts=attempts, timeout=timeout)
         if ok and med is not None:
             ms = max(1, int(med))
 
@@ -1097,14 +1458,9 @@ class SpeedTester:
         try_hosts_limit = int(tls_cfg.get("try_hosts_limit", 3)) if isinstance(tls_cfg, dict) else 3
 
         if measure_jitter:
-            # 在线程池中执行同步的高级测速（避免阻塞事件循环）
-            loop = asyncio.get_event_loop()
-            metrics = await loop.run_in_executor(
-                None,
-                lambda: self.tcp_advanced_metrics(ip, port=port, attempts=attempts, timeout=timeout),
-            )
+            metrics = await self.tcp_advanced_metrics_async(ip, port=port, attempts=attempts, timeout=timeout)
         else:
-            med, ok, err = await self._tcp_connect_rtt_ms_async(ip, port=port, timeout=timeout)
+            med, ok, err = await self.tcp_median_rtt_ms_async(ip, port=port, attempts=attempts, timeout=timeout)
             metrics = {"median": med, "ok": ok, "err": err}
 
         if isinstance(metrics, dict) and ("ok" not in metrics):
@@ -0,0 +1,5 @@
+"""测试公共配置：把仓库根目录加入 sys.path，测试可直接 import 各模块。"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,22 @@
+"""hosts_file 测试（只读写临时文件，不触碰系统 hosts）。"""
+import codecs
+
+from hosts_file import HostsFileManager
+
+
+def test_apply_twice_keeps_utf16_hosts_intact(tmp_path):
+    """UTF-16 hosts 连续写入两次：第二次命中缓存也不能把 ASCII 块拼到 UTF-16 字节上。"""
+    hosts = tmp_path / "hosts"
+    hosts.write_bytes(codecs.BOM_UTF16_LE + "127.0.0.1 localhost\r\n".encode("utf-16-le"))
+    mgr = HostsFileManager(hosts_path=str(hosts), backup_dir=str(tmp_path / "backup"))
+
+    mgr.apply_smart_block([("192.0.2.1", "a.example")], allow_elevate=False)
+    mgr.apply_smart_block([("192.0.2.2", "b.example")], allow_elevate=False)
+
+    raw = hosts.read_bytes()
+    assert raw.startswith(codecs.BOM_UTF16_LE)
+    text = raw.decode("utf-16")
+    assert text.count(mgr.start_mark) == 1
+    assert text.count(mgr.end_mark) == 1
+    assert "127.0.0.1 localhost" in text
+    assert "b.example" in text and "a.example" not in text
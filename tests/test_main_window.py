@@ -0,0 +1,38 @@
+"""main_window 冒烟测试（需要 ttkbootstrap；不创建窗口，只走不依赖 Tk 的代码路径）。"""
+import pytest
+
+pytest.importorskip("ttkbootstrap")
+
+import main_window  # noqa: E402
+from main_window import HostsOptimizer  # noqa: E402
+
+
+def _bare_optimizer():
+    # 不调用 __init__：不需要 Tk 根窗口 / 显示器
+    return HostsOptimizer.__new__(HostsOptimizer)
+
+
+def test_speed_test_config_setter_builds_flat_view():
+    app = _bare_optimizer()
+    cfg = {"tcp": {"port": 8443, "timeout": 1.5}, "tls": {"enabled": False}, "bad": 1}
+    app.speed_test_config = cfg
+    assert app.speed_test_config is cfg
+    assert app._flat_config == {"tcp.port": 8443, "tcp.timeout": 1.5, "tls.enabled": False}
+
+
+def test_speed_test_config_setter_accepts_default_config():
+    app = _bare_optimizer()
+    app.speed_test_config = main_window.SPEED_TEST_CONFIG.copy()
+    assert app._flat_config["tcp.port"] == main_window.SPEED_TEST_CONFIG["tcp"]["port"]
+
+
+def test_speed_settings_spinbox_steps_reach_defaults():
+    """数值项的默认值须在范围内，且能从最小值按微调步长走到（箭头可回到默认值）。"""
+    for _, _, rows in main_window._SPEED_SETTINGS_TABS:
+        for kind, key, _, default, _, check in rows:
+            if kind != "entry":
+                continue
+            _, _, min_val, max_val, step = check
+            assert min_val <= default <= max_val, key
+            steps = (default - min_val) / step
+            assert abs(steps - round(steps)) < 1e-6, key
@@ -0,0 +1,52 @@
+"""静态检查：各模块函数内引用的全局名都必须在模块级有定义（导入 / 赋值 / def）。
+
+用 symtable 分析源码，不导入模块本身，因此无需安装 GUI / 网络依赖也能运行；
+用于尽早发现“删掉了仍被调用的模块级函数”这类启动即 NameError 的问题。
+"""
+import builtins
+import glob
+import os
+import re
+import symtable
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE_DUNDERS = {"__file__", "__name__", "__doc__", "__spec__", "__loader__", "__package__", "__builtins__"}
+# `from xxx.constants import *` 引入的常量（BOTH / W / NORMAL ...）不在符号表中，按全大写名放行
+STAR_CONSTANT_RE = re.compile(r"[A-Z][A-Z0-9_]*")
+
+
+def _undefined_globals(path):
+    with open(path, encoding="utf-8") as f:
+        src = f.read()
+    top = symtable.symtable(src, path, "exec")
+    defined = {s.get_name() for s in top.get_symbols() if s.is_assigned() or s.is_imported()}
+    has_star = "import *" in src
+
+    def is_missing(name):
+        if name in defined or name in MODULE_DUNDERS or hasattr(builtins, name):
+            return False
+        return not (has_star and STAR_CONSTANT_RE.fullmatch(name))
+
+    missing = {("<module>", s.get_name()) for s in top.get_symbols()
+               if s.is_referenced() and not (s.is_assigned() or s.is_imported()) and is_missing(s.get_name())}
+
+    def walk(table):
+        for child in table.get_children():
+            for s in child.get_symbols():
+                if s.is_global() and s.is_referenced() and is_missing(s.get_name()):
+                    missing.add((child.get_name(), s.get_name()))
+            walk(child)
+
+    walk(top)
+    return sorted(missing)
+
+
+@pytest.mark.parametrize(
+    "path",
+    sorted(glob.glob(os.path.join(ROOT, "*.py"))),
+    ids=os.path.basename,
+)
+def test_no_undefined_module_globals(path):
+    assert _undefined_globals(path) == []
@@ -0,0 +1,67 @@
+"""services 测试（需要 requests / urllib3；不发起真实网络或 DNS 请求）。"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from services import DomainResolver  # noqa: E402
+
+
+def test_coalesced_resolve_survives_other_callers_timeout():
+    """两次解析重叠且共享域名：先发起的一方超时取消排队中的查询，后一方仍应拿到结果。"""
+    release = threading.Event()
+
+    def fake_resolve(domain, ipv4_only, ipv6_only):
+        if domain == "slow.example":
+            release.wait(5)
+            return []
+        return ["192.0.2.1"]
+
+    # 单线程：调用 A 的 shared.example 排在 slow.example 之后，B 复用这个排队中的 Future
+    resolver = DomainResolver(max_workers=1, timeout=1.0)
+    resolver._resolve_single_domain = fake_resolve
+
+    results = {}
+    a = threading.Thread(target=lambda: results.setdefault("a", resolver.resolve(["slow.example", "shared.example"])))
+    b = threading.Thread(target=lambda: results.setdefault("b", resolver.resolve(["shared.example"])))
+    try:
+        a.start()
+        time.sleep(0.3)  # 确保 A 已提交，B 走复用路径
+        b.start()
+        a.join(5)
+        b.join(5)
+    finally:
+        release.set()
+
+    assert results["a"] == []  # A 超时：两个域名都没有结果
+    assert results["b"] == [("192.0.2.1", "shared.example")]
+
+
+def test_resolve_coalesces_concurrent_identical_queries():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def fake_resolve(domain, ipv4_only, ipv6_only):
+        calls.append(domain)
+        started.set()
+        release.wait(5)
+        return ["192.0.2.2"]
+
+    resolver = DomainResolver(max_workers=2, timeout=3.0)
+    resolver._resolve_single_domain = fake_resolve
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve(["a.example"]))) for _ in range(2)]
+    threads[0].start()
+    assert started.wait(2)
+    threads[1].start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert calls == ["a.example"]
+    assert results == [[("192.0.2.2", "a.example")]] * 2
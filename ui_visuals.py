@@ -6,10 +6,12 @@ ui_visuals.py
 - Pillow 可用时生成背景图
 - Pillow 不可用时退化为纯色背景
 - 对 <Configure> 做节流，避免窗口缩放时频繁重绘导致卡顿
+- 小窗口不画噪点；单次重绘超出预算时进入简化模式（无模糊光晕、无噪点），每隔若干次重绘再尝试完整效果
 """
 
 from __future__ import annotations
 
+import time
 import tkinter as tk
 from typing import Any, Dict, Optional
 
@@ -26,6 +28,20 @@ try:
 except Exception:  # pragma: no cover
     pass
 
+# Pillow-SIMD 的版本号带 .postN 后缀；SIMD 版滤镜足够快，始终使用完整效果
+try:
+    import PIL  # type: ignore
+    PIL_SIMD = ".post" in getattr(PIL, "__version__", "")
+except Exception:  # pragma: no cover
+    PIL_SIMD = False
+
+# 噪点层最小窗口尺寸（宽, 高）：更小的窗口上噪点几乎不可见，直接跳过
+NOISE_MIN_SIZE = (900, 600)
+# 单次重绘耗时预算（秒）：超出则进入简化模式
+REDRAW_BUDGET_S = 0.050
+# 简化模式下每隔多少次重绘重新尝试一次完整效果
+CHEAP_MODE_RECHECK_EVERY = 10
+
 
 COLORS = {
     "bg_dark": "#0b1020",
@@ -72,6 +88,10 @@ class GlassBackground:
         self._img_id = None
         self._after_id = None
 
+        # 简化模式：上次完整重绘超出预算时启用
+        self._cheap_mode = False
+        self._render_count = 0
+
         # add="+" 避免覆盖别的 <Configure> 绑定
         try:
             master.bind("<Configure>", self._schedule_redraw, add="+")
@@ -85,6 +105,10 @@ class GlassBackground:
         except Exception:
             pass
 
+    def refresh(self) -> None:
+        """请求一次（节流的）重绘：用于错过了首个 <Configure> 的延迟创建场景。"""
+        self._schedule_redraw()
+
     def _schedule_redraw(self, _evt=None) -> None:
         """节流重绘：窗口尺寸变化频繁时避免过度重绘。"""
         if self._after_id:
@@ -105,6 +129,12 @@ class GlassBackground:
             self.lower()
             return
 
+        t0 = time.perf_counter()
+        self._render_count += 1
+        cheap = self._cheap_mode and not PIL_SIMD
+        if cheap and self._render_count % CHEAP_MODE_RECHECK_EVERY == 0:
+            cheap = False  # 定期重新评估：再试一次完整效果
+
         # 生成 1×H 的渐变条，然后 resize 到目标尺寸（更省）
         grad = Image.new("RGB", (1, h), COLORS["bg_dark"])
         gpx = grad.load()
@@ -126,19 +156,23 @@ class GlassBackground:
 
         img = grad.resize((w, h), resample=Image.BILINEAR)
 
-        # 光晕
+        # 光晕（简化模式：用一层平铺的淡色代替高斯模糊光晕）
         glow = Image.new("RGBA", (w, h), (0, 0, 0, 0))
         draw = ImageDraw.Draw(glow)
-        draw.ellipse((-w * 0.3, -h * 0.4, w * 0.8, h * 0.7), fill=self.glow_colors["glow_1"])
-        draw.ellipse((w * 0.2, h * 0.1, w * 1.2, h * 1.1), fill=self.glow_colors["glow_2"])
-        glow = glow.filter(ImageFilter.GaussianBlur(radius=50))
+        if cheap:
+            draw.rectangle((0, 0, w, h), fill=self.glow_colors["glow_2"])
+        else:
+            draw.ellipse((-w * 0.3, -h * 0.4, w * 0.8, h * 0.7), fill=self.glow_colors["glow_1"])
+            draw.ellipse((w * 0.2, h * 0.1, w * 1.2, h * 1.1), fill=self.glow_colors["glow_2"])
+            glow = glow.filter(ImageFilter.GaussianBlur(radius=50))
         img = Image.alpha_composite(img.convert("RGBA"), glow).convert("RGB")
 
-        # 噪点
-        noise = Image.effect_noise((w, h), self.noise_level).convert("L")
-        noise = noise.point(lambda v: self.noise_opacity if v > 120 else 0)
-        noise_rgba = Image.merge("RGBA", (noise, noise, noise, noise))
-        img = Image.alpha_composite(img.convert("RGBA"), noise_rgba).convert("RGB")
+        # 噪点（简化模式或小窗口时跳过）
+        if not cheap and w >= NOISE_MIN_SIZE[0] and h >= NOISE_MIN_SIZE[1]:
+            noise = Image.effect_noise((w, h), self.noise_level).convert("L")
+            noise = noise.point(lambda v: self.noise_opacity if v > 120 else 0)
+            noise_rgba = Image.merge("RGBA", (noise, noise, noise, noise))
+            img = Image.alpha_composite(img.convert("RGBA"), noise_rgba).convert("RGB")
 
         self._img = ImageTk.PhotoImage(img)
         if self._img_id is None:
@@ -146,5 +180,9 @@ class GlassBackground:
         else:
             self.canvas.itemconfig(self._img_id, image=self._img)
 
+        # 仅由完整重绘的耗时决定是否进入/退出简化模式
+        if not cheap:
+            self._cheap_mode = (time.perf_counter() - t0) > REDRAW_BUDGET_S
+
         # 绘制完成后确保在最底层
         self.lower()
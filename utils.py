@@ -7,6 +7,7 @@ utils.py
 - user_data_path：把可写配置/数据放到用户目录（避免写到资源目录）
 - atomic_write_*：原子写入，避免写到一半导致文件损坏
 - is_admin / check_and_elevate / restart_as_admin：Windows 管理员权限相关
+- HIDDEN_STARTUPINFO / CREATE_NO_WINDOW：隐藏子进程窗口（进程内复用）
 """
 
 from __future__ import annotations
@@ -22,6 +23,12 @@ from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from typing import Any, List, Optional
 
+# 尝试导入 orjson（可选，更快的 JSON 读写；不存在时回退到标准库 json）
+orjson = None
+try:
+    import orjson  # type: ignore
+except ImportError:
+    pass
 
 # ---------------------------------------------------------------------
 # 资源路径（兼容 PyInstaller）
@@ -192,6 +199,24 @@ def restart_as_admin(args: List[str]) -> None:
         sys.exit(1)
 
 
+# ---------------------------------------------------------------------
+# 子进程窗口（Windows）
+# ---------------------------------------------------------------------
+def _build_hidden_startupinfo() -> Optional["subprocess.STARTUPINFO"]:
+    try:
+        si = subprocess.STARTUPINFO()  # type: ignore[attr-defined]
+        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # type: ignore[attr-defined]
+        return si
+    except AttributeError:
+        return None
+
+
+# 进程生命周期内不变，构建一次复用（subprocess 在 Windows 上会先复制再使用，可跨线程共享）
+HIDDEN_STARTUPINFO = _build_hidden_startupinfo()
+# 控制台程序（ipconfig/ping）不分配 conhost 窗口；非 Windows 为 0
+CREATE_NO_WINDOW: int = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
 # ---------------------------------------------------------------------
 # 文件读写（原子写入）
 # ---------------------------------------------------------------------
@@ -214,6 +239,25 @@ def atomic_write_text(path: str, text: str, *, encoding: str = "utf-8") -> None:
             pass
 
 
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """原子写入二进制文件：写临时文件 -> os.replace 覆盖。"""
+    folder = os.path.dirname(os.path.abspath(path))
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except Exception:
+            pass
+
+
 def atomic_write_json(
     path: str,
     data: Any,
@@ -222,7 +266,19 @@ def atomic_write_json(
     ensure_ascii: bool = False,
     indent: int = 2,
 ) -> None:
-    """原子写入 JSON 文件。"""
+    """原子写入 JSON 文件。
+
+    安装了 orjson 且参数兼容（UTF-8、不转义非 ASCII、缩进为 2 或无缩进）时用 orjson 直接输出字节；
+    否则回退到标准库 json。
+    """
+    if orjson is not None and not ensure_ascii and encoding.lower() in ("utf-8", "utf8") and indent in (None, 2):
+        try:
+            raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            raw = None  # orjson 不支持的类型（如非 str 键）：回退到标准库
+        if raw is not None:
+            atomic_write_bytes(path, raw)
+            return
     txt = json.dumps(data, ensure_ascii=ensure_ascii, indent=indent)
     atomic_write_text(path, txt, encoding=encoding)
 
@@ -230,6 +286,9 @@ def atomic_write_json(
 def safe_read_json(path: str, default: Any) -> Any:
     """读取 JSON，失败返回 default。"""
     try:
+        if orjson is not None:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception: